@@ -2,13 +2,18 @@
 
 import asyncio
 import hashlib
+import heapq
+import ipaddress
 import logging
 import time
+from collections.abc import AsyncIterator
 from typing import Any
 
 import httpx
 from fastapi import APIRouter
 from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from starlette.background import BackgroundTask
 
 from app.config import config
 from app.exceptions import ImageProxyError, ValidationError
@@ -32,7 +37,9 @@ from app.scrapers import (
 )
 from app.utils.database import db
 from app.utils.geolocation import geolocation_service
-from app.utils.price_parser import PriceParser
+from app.utils.http_client import http_client_pool
+from app.utils.price_parser import calculate_tax, calculate_total
+from app.utils.result_cache import search_result_cache
 from app.utils.search_validator import search_validator
 
 logger = logging.getLogger(__name__)
@@ -53,47 +60,134 @@ SCRAPERS = {
     "duckduckgo": DuckDuckGoScraper,
 }
 
+# Validates cached product lists straight from their JSON documents
+PRODUCT_LIST_ADAPTER = TypeAdapter(list[Product])
+
+# Hosts the image proxy must never contact
+BLOCKED_HOSTS = frozenset(
+    {
+        "localhost",
+        "127.0.0.1",
+        "0.0.0.0",  # nosec
+        "::1",
+        "169.254.169.254",  # AWS metadata
+        "metadata.google.internal",  # GCP metadata
+    }
+)
+
+# Known merchant image domains the image proxy may fetch from
+ALLOWED_IMAGE_DOMAINS = frozenset(
+    {
+        "amazon.com",
+        "amazonaws.com",  # Amazon
+        "ebay.com",
+        "ebayimg.com",  # eBay
+        "walmart.com",
+        "walmartimages.com",  # Walmart
+        "target.com",
+        "targetimg1.com",  # Target
+        "bestbuy.com",
+        "bbystatic.com",  # Best Buy
+        "newegg.com",
+        "neweggimages.com",  # Newegg
+    }
+)
+
+# Proper subdomain suffixes (leading '.' prevents suffix matching attacks)
+ALLOWED_IMAGE_SUFFIXES = tuple(f".{domain}" for domain in ALLOWED_IMAGE_DOMAINS)
+
+# Caps how many scrapers run at once across all requests
+SCRAPER_SEMAPHORE = asyncio.Semaphore(config.get_max_concurrent_scrapers())
+
+# Chunk size used when streaming proxied images to the client
+IMAGE_PROXY_CHUNK_SIZE = 64 * 1024
+
+# Largest image the proxy will pass through
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+
 
 def get_cache_key(query: str, merchant: str, filters: dict[str, Any]) -> str:
     """Generate cache key for search"""
     key_data = f"{query}:{merchant}:{filters!s}"
-    return hashlib.sha256(key_data.encode()).hexdigest()
-
-
-async def enrich_product_with_tax_shipping(
-    product: Product, location: dict | None = None
-) -> Product:
-    """Enrich product with tax and shipping calculations"""
-    if not location:
-        # Try to get location (in production, would get from request IP)
-        location = await geolocation_service.get_location_from_ip()
-
-    # Calculate shipping
-    shipping_cost = 0.0
-    if config.is_shipping_enabled():
-        shipping_cost = geolocation_service.estimate_shipping(product.merchant, product.base_price)
-
-    # Calculate tax
-    tax = 0.0
-    if config.is_tax_enabled() and location:
-        state = location.get("state", "")
-        tax_rate = geolocation_service.get_tax_rate(state)
-        tax = PriceParser.calculate_tax(product.base_price, tax_rate)
-
-    # Calculate total
-    total_price = PriceParser.calculate_total(product.base_price, shipping_cost, tax)
-
-    # Create new product instance (Pydantic v2 models are immutable)
-    return product.model_copy(
-        update={
-            "shipping_cost": shipping_cost,
-            "tax": tax,
-            "total_price": total_price,
-            "price": total_price,  # Use total price as main price
-        }
+    # Non-cryptographic use: a 128-bit BLAKE2b digest is faster than SHA-256
+    return hashlib.blake2b(key_data.encode(), digest_size=16).hexdigest()
+
+
+def is_non_public_ip(hostname: str) -> bool:
+    """Check whether hostname is an IP literal outside the public address space"""
+    try:
+        ip = ipaddress.ip_address(hostname)
+    except ValueError:
+        # Not an IP literal; domain names are checked against the allow-list
+        return False
+    # is_global excludes private, loopback, link-local, reserved and shared
+    # (CGNAT) space; multicast is rejected explicitly
+    return not ip.is_global or ip.is_multicast
+
+
+def is_allowed_image_host(hostname: str) -> bool:
+    """Check hostname is an allowed image domain or a proper subdomain of one"""
+    hostname_lower = hostname.lower()
+    return hostname_lower in ALLOWED_IMAGE_DOMAINS or hostname_lower.endswith(
+        ALLOWED_IMAGE_SUFFIXES
     )
 
 
+async def iter_image_bytes(response: httpx.Response) -> AsyncIterator[bytes]:
+    """Stream an image body, aborting once it exceeds MAX_IMAGE_BYTES"""
+    received = 0
+    async for chunk in response.aiter_bytes(chunk_size=IMAGE_PROXY_CHUNK_SIZE):
+        received += len(chunk)
+        if received > MAX_IMAGE_BYTES:
+            # Upstream sent no (or a wrong) Content-Length. The status line is already
+            # out, so raise to abort the response rather than end it cleanly and hand
+            # the client a truncated image that looks complete
+            logger.warning(f"Image exceeded {MAX_IMAGE_BYTES} bytes, aborting: {response.url}")
+            raise ImageProxyError("Image is too large", status_code=413)
+        yield chunk
+
+
+def enrich_products_with_tax_shipping(
+    products: list[Product], location: dict | None
+) -> list[Product]:
+    """Enrich products with tax and shipping calculations in a single pass"""
+    shipping_enabled = config.shipping_enabled
+    tax_enabled = config.tax_enabled and bool(location)
+    if not shipping_enabled and not tax_enabled:
+        # Nothing to add: scraped products already carry price == total_price
+        return products
+
+    # The tax rate depends only on location, so resolve it once per batch
+    tax_rate = geolocation_service.get_tax_rate(location.get("state", "")) if tax_enabled else 0.0
+
+    enriched = []
+    for product in products:
+        # Calculate shipping
+        shipping_cost = 0.0
+        if shipping_enabled:
+            shipping_cost = geolocation_service.estimate_shipping(
+                product.merchant, product.base_price
+            )
+
+        # Calculate tax
+        tax = calculate_tax(product.base_price, tax_rate) if tax_enabled else 0.0
+
+        # Calculate total
+        total_price = calculate_total(product.base_price, shipping_cost, tax)
+
+        # Shallow-copy and set the computed floats directly; they are already the
+        # right types, so there is nothing to validate
+        enriched_product = product.model_copy()
+        enriched_product.__dict__.update(
+            shipping_cost=shipping_cost,
+            tax=tax,
+            total_price=total_price,
+            price=total_price,  # Use total price as main price
+        )
+        enriched.append(enriched_product)
+    return enriched
+
+
 @router.post("/api/validate", response_model=ValidationResponse)
 async def validate_search(request: ValidationRequest):
     """Validate a search query and get suggestions"""
@@ -117,11 +211,120 @@ async def validate_search(request: ValidationRequest):
         raise ValidationError(f"Failed to validate query: {e!s}")
 
 
+def get_enabled_merchants(request: SearchRequest) -> list[str]:
+    """Merchants to search for a request, filtered to enabled ones once
+
+    Defaults to every configured merchant; duplicates are dropped.
+    """
+    merchants_to_search = request.merchants or config.settings.get("merchants", {})
+    return [
+        merchant
+        for merchant in dict.fromkeys(merchants_to_search)
+        if config.get_merchant_enabled(merchant)
+    ]
+
+
+async def search_merchant(request: SearchRequest, merchant: str) -> tuple[list[Product], bool]:
+    """Serve a merchant from cache, falling back to a live scrape on a miss
+
+    Returns the products and whether they came from the cache.
+    """
+    cache_enabled = config.cache_enabled
+    # Hash once per merchant; the same key is reused when storing a miss
+    cache_key = ""
+    if cache_enabled:
+        cache_filters = {
+            "max_results": request.max_results,
+            "min_price": request.min_price,
+            "max_price": request.max_price,
+        }
+        cache_key = get_cache_key(request.query, merchant, cache_filters)
+        # Recent results are served from memory without touching SQLite
+        products = search_result_cache.get(cache_key)
+        if products is not None:
+            return products, True
+        cached = await db.get_cached_search_json(cache_key)
+        if cached:
+            # Parse and validate the whole list in one pass
+            products = PRODUCT_LIST_ADAPTER.validate_json(cached)
+            search_result_cache.set(cache_key, products)
+            return products, True
+
+    scraper_class = SCRAPERS.get(merchant)
+    if not scraper_class:
+        return [], False
+
+    try:
+        scraper = scraper_class()
+        # Wait out the merchant's rate limit before taking a scraper slot, so
+        # sleeping scrapers don't hold the semaphore
+        if await scraper.wait_for_turn(request.query):
+            async with SCRAPER_SEMAPHORE, scraper:
+                products = await scraper.fetch(request.query, request.max_results)
+        else:
+            products = []
+        # Cache results
+        if cache_enabled:
+            search_result_cache.set(cache_key, products)
+            try:
+                await db.cache_search(
+                    cache_key,
+                    request.query,
+                    merchant,
+                    [p.model_dump() for p in products],
+                    config.get_cache_ttl_hours(),
+                )
+            except Exception as cache_error:
+                logger.warning(f"Failed to cache results for {merchant}: {cache_error}")
+        return products, False
+    except Exception as e:
+        logger.error(f"Error searching {merchant}: {e}", exc_info=True)
+        # Don't fail the entire request if one merchant fails
+        return [], False
+
+
+def filter_products(products: list[Product], request: SearchRequest) -> list[Product]:
+    """Apply the request's price and brand filters"""
+    brand_lc = request.brand.lower() if request.brand else None
+    filtered_products = []
+    for product in products:
+        if request.min_price is not None and product.base_price < request.min_price:
+            continue
+        if request.max_price is not None and product.base_price > request.max_price:
+            continue
+        if brand_lc and brand_lc not in product.title.lower():
+            continue
+        filtered_products.append(product)
+    return filtered_products
+
+
+def rank_products(products: list[Product], request: SearchRequest) -> list[Product]:
+    """Keep the cheapest products by total price, in-stock first"""
+    # Handle out of stock
+    in_stock = []
+    out_of_stock = []
+    for product in products:
+        if product.availability == "out_of_stock":
+            out_of_stock.append(product)
+        else:
+            in_stock.append(product)
+
+    # Select the cheapest results without sorting everything
+    final_products = heapq.nsmallest(request.max_results, in_stock, key=lambda p: p.total_price)
+    remaining = request.max_results - len(final_products)
+    if request.include_out_of_stock and remaining > 0:
+        final_products += heapq.nsmallest(remaining, out_of_stock, key=lambda p: p.total_price)
+    return final_products
+
+
 @router.post("/api/search", response_model=SearchResponse)
 async def search_products(request: SearchRequest):
     """Search for products across merchants"""
     start_time = time.time()
 
+    # Resolve location concurrently with validation and scraping
+    location_task = asyncio.create_task(geolocation_service.get_location_from_ip())
+
     # Optional pre-validation (non-blocking)
     if config.is_validation_enabled():
         try:
@@ -132,124 +335,26 @@ async def search_products(request: SearchRequest):
         except Exception as e:
             logger.warning(f"Validation error (non-blocking): {e}")
 
-    # Determine which merchants to search
-    merchants_to_search = request.merchants or []
-    if not merchants_to_search:
-        # Get enabled merchants from config
-        for merchant, enabled in config.settings.get("merchants", {}).items():
-            if enabled:
-                merchants_to_search.append(merchant)
-
+    # Probe cache and scrape every merchant concurrently, so a cache miss never
+    # waits on the other merchants' cache lookups
     all_products: list[Product] = []
-    location = None
-
-    # Check cache first
-    cached_results: dict[str, list[dict[str, Any]]] = {}
-    if config.is_cache_enabled():
-        for merchant in merchants_to_search:
-            if not config.get_merchant_enabled(merchant):
-                continue
-            cache_key = get_cache_key(
-                request.query,
-                merchant,
-                {
-                    "max_results": request.max_results,
-                    "min_price": request.min_price,
-                    "max_price": request.max_price,
-                },
-            )
-            cached = await db.get_cached_search(cache_key)
-            if cached:
-                cached_results[merchant] = cached
-
-    # Search each merchant
-    tasks = []
-    for merchant in merchants_to_search:
-        if not config.get_merchant_enabled(merchant):
-            continue
-
-        if merchant in cached_results:
-            # Use cached results
-            products = [Product(**p) for p in cached_results[merchant]]
-            all_products.extend(products)
-            continue
-
-        scraper_class = SCRAPERS.get(merchant)
-        if not scraper_class:
-            continue
-
-        async def search_merchant(m: str, sc: type):
-            try:
-                async with sc() as scraper:
-                    products = await scraper.search(request.query, request.max_results)
-                    # Cache results
-                    if config.is_cache_enabled():
-                        try:
-                            cache_key = get_cache_key(
-                                request.query,
-                                m,
-                                {
-                                    "max_results": request.max_results,
-                                    "min_price": request.min_price,
-                                    "max_price": request.max_price,
-                                },
-                            )
-                            await db.cache_search(
-                                cache_key,
-                                request.query,
-                                m,
-                                [p.model_dump() for p in products],
-                                config.get_cache_ttl_hours(),
-                            )
-                        except Exception as cache_error:
-                            logger.warning(f"Failed to cache results for {m}: {cache_error}")
-                    return products
-            except Exception as e:
-                logger.error(f"Error searching {m}: {e}", exc_info=True)
-                # Don't fail the entire request if one merchant fails
-                return []
-
-        tasks.append(search_merchant(merchant, scraper_class))
-
-    # Wait for all searches to complete
+    served_from_cache = False
+    tasks = [search_merchant(request, merchant) for merchant in get_enabled_merchants(request)]
     if tasks:
         results = await asyncio.gather(*tasks, return_exceptions=True)
         for result in results:
-            if isinstance(result, list):
-                all_products.extend(result)
+            if isinstance(result, tuple):
+                products, from_cache = result
+                all_products.extend(products)
+                served_from_cache = served_from_cache or from_cache
 
     # Get location for tax/shipping calculation
-    location = await geolocation_service.get_location_from_ip()
-
-    # Enrich products with tax and shipping
-    enriched_products = []
-    for product in all_products:
-        # Apply filters
-        if request.min_price is not None and product.base_price < request.min_price:
-            continue
-        if request.max_price is not None and product.base_price > request.max_price:
-            continue
-        if request.brand and request.brand.lower() not in product.title.lower():
-            continue
+    location = await location_task
 
-        # Enrich with tax/shipping
-        product = await enrich_product_with_tax_shipping(product, location)
-        enriched_products.append(product)
-
-    # Sort by total price
-    enriched_products.sort(key=lambda p: p.total_price)
-
-    # Handle out of stock
-    in_stock = [p for p in enriched_products if p.availability != "out_of_stock"]
-    out_of_stock = [p for p in enriched_products if p.availability == "out_of_stock"]
-
-    if request.include_out_of_stock:
-        final_products = in_stock + out_of_stock
-    else:
-        final_products = in_stock
-
-    # Limit results
-    final_products = final_products[: request.max_results]
+    # Apply filters, enrich with tax and shipping, then pick the cheapest
+    filtered_products = filter_products(all_products, request)
+    enriched_products = enrich_products_with_tax_shipping(filtered_products, location)
+    final_products = rank_products(enriched_products, request)
 
     search_time = time.time() - start_time
 
@@ -257,11 +362,45 @@ async def search_products(request: SearchRequest):
         products=final_products,
         total_results=len(final_products),
         search_time=search_time,
-        cached=len(cached_results) > 0,
+        cached=served_from_cache,
         location=location,
     )
 
 
+@router.post("/api/search/stream")
+async def stream_search_products(request: SearchRequest):
+    """Stream products as NDJSON, one line per product, as each merchant finishes
+
+    Each merchant's batch is filtered, enriched and ranked on its own (up to
+    max_results per merchant); clients that need a single globally ranked list
+    should use /api/search instead.
+    """
+    merchants = get_enabled_merchants(request)
+    location_task = asyncio.create_task(geolocation_service.get_location_from_ip())
+
+    async def generate() -> AsyncIterator[str]:
+        tasks = [asyncio.create_task(search_merchant(request, m)) for m in merchants]
+        try:
+            location = await location_task
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    products, _ = await next_done
+                except Exception as e:
+                    logger.error(f"Error streaming search results: {e}", exc_info=True)
+                    continue
+                products = enrich_products_with_tax_shipping(
+                    filter_products(products, request), location
+                )
+                for product in rank_products(products, request):
+                    yield product.model_dump_json() + "\n"
+        finally:
+            # Stop outstanding scrapes if the client disconnects early
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.get("/api/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
@@ -313,66 +452,15 @@ async def proxy_image(url: str):
         raise ImageProxyError("Invalid hostname", status_code=400)
 
     # Block localhost and private IP ranges
-    blocked_hosts = {
-        "localhost",
-        "127.0.0.1",
-        "0.0.0.0",  # nosec
-        "::1",
-        "169.254.169.254",  # AWS metadata
-        "metadata.google.internal",  # GCP metadata
-    }
-
-    if hostname.lower() in blocked_hosts:
+    if hostname.lower() in BLOCKED_HOSTS:
         raise ImageProxyError("Access to this host is not allowed", status_code=403)
 
-    # Block private IP ranges (10.x.x.x, 172.16-31.x.x, 192.168.x.x)
-    if hostname.startswith("10.") or hostname.startswith("192.168."):
+    # Block private, loopback, link-local and other non-public IP addresses
+    if is_non_public_ip(hostname):
         raise ImageProxyError("Access to private IP ranges is not allowed", status_code=403)
 
-    if hostname.startswith("172."):
-        parts = hostname.split(".")
-        if len(parts) >= 2:
-            try:
-                second_octet = int(parts[1])
-                if 16 <= second_octet <= 31:
-                    raise ImageProxyError(
-                        "Access to private IP ranges is not allowed", status_code=403
-                    )
-            except ValueError:
-                pass
-
     # Only allow known merchant image domains
-    allowed_domains = {
-        "amazon.com",
-        "amazonaws.com",  # Amazon
-        "ebay.com",
-        "ebayimg.com",  # eBay
-        "walmart.com",
-        "walmartimages.com",  # Walmart
-        "target.com",
-        "targetimg1.com",  # Target
-        "bestbuy.com",
-        "bbystatic.com",  # Best Buy
-        "newegg.com",
-        "neweggimages.com",  # Newegg
-    }
-
-    # Validate hostname matches allowed domain exactly or is a proper subdomain
-    hostname_lower = hostname.lower()
-    is_allowed = False
-
-    # Check exact match first
-    if hostname_lower in allowed_domains:
-        is_allowed = True
-    else:
-        # Check if it's a proper subdomain (e.g., images.amazon.com for amazon.com)
-        # Must end with '.' + domain to prevent suffix matching attacks
-        for domain in allowed_domains:
-            if hostname_lower == domain or hostname_lower.endswith("." + domain):
-                is_allowed = True
-                break
-
-    if not is_allowed:
+    if not is_allowed_image_host(hostname):
         raise ImageProxyError("Image host not in allowed list", status_code=403)
 
     # Helper function to validate redirect URLs
@@ -386,73 +474,56 @@ async def proxy_image(url: str):
                 return False
 
             # Block localhost and private IP ranges
-            if redirect_hostname.lower() in blocked_hosts:
+            if redirect_hostname.lower() in BLOCKED_HOSTS:
                 return False
 
             # Block private IP ranges
-            if redirect_hostname.startswith("10.") or redirect_hostname.startswith("192.168."):
+            if is_non_public_ip(redirect_hostname):
                 return False
 
-            if redirect_hostname.startswith("172."):
-                parts = redirect_hostname.split(".")
-                if len(parts) >= 2:
-                    try:
-                        second_octet = int(parts[1])
-                        if 16 <= second_octet <= 31:
-                            return False
-                    except ValueError:
-                        pass
-
             # Validate redirect hostname matches allowed domain
-            redirect_hostname_lower = redirect_hostname.lower()
-            if redirect_hostname_lower in allowed_domains:
-                return True
-
-            for domain in allowed_domains:
-                if redirect_hostname_lower == domain or redirect_hostname_lower.endswith(
-                    "." + domain
-                ):
-                    return True
-
-            return False
+            return is_allowed_image_host(redirect_hostname)
         except Exception:
             return False
 
     try:
-        # Disable automatic redirects and handle them manually to validate each redirect
-        async with httpx.AsyncClient(timeout=10.0, follow_redirects=False) as client:
-            max_redirects = 5
-            current_url = url
-            response = None
-
-            for _ in range(max_redirects):
-                response = await client.get(current_url)
+        # The shared client has automatic redirects disabled, so they are handled
+        # manually to validate each redirect
+        client = http_client_pool.get_client()
+        max_redirects = 5
+        current_url = url
+        response = None
+
+        for _ in range(max_redirects):
+            response = await client.send(client.build_request("GET", current_url), stream=True)
+
+            # If not a redirect, we're done
+            if response.status_code not in (301, 302, 303, 307, 308):
+                break
 
-                # If not a redirect, we're done
-                if response.status_code not in (301, 302, 303, 307, 308):
-                    break
+            # Redirect bodies are never read, release the connection right away
+            await response.aclose()
 
-                # Get redirect location
-                redirect_url = response.headers.get("location")
-                if not redirect_url:
-                    raise ImageProxyError("Invalid redirect", status_code=400)
+            # Get redirect location
+            redirect_url = response.headers.get("location")
+            if not redirect_url:
+                raise ImageProxyError("Invalid redirect", status_code=400)
 
-                # Make redirect URL absolute if relative
-                if not redirect_url.startswith(("http://", "https://")):
-                    redirect_parsed = urlparse(current_url)
-                    redirect_url = (
-                        f"{redirect_parsed.scheme}://{redirect_parsed.netloc}{redirect_url}"
-                    )
+            # Make redirect URL absolute if relative
+            if not redirect_url.startswith(("http://", "https://")):
+                redirect_parsed = urlparse(current_url)
+                redirect_url = f"{redirect_parsed.scheme}://{redirect_parsed.netloc}{redirect_url}"
 
-                # Validate redirect URL
-                if not validate_redirect_url(redirect_url):
-                    raise ImageProxyError("Redirect to unauthorized host", status_code=403)
+            # Validate redirect URL
+            if not validate_redirect_url(redirect_url):
+                raise ImageProxyError("Redirect to unauthorized host", status_code=403)
 
-                current_url = redirect_url
+            current_url = redirect_url
 
-            if response is None:
-                raise ImageProxyError("Failed to fetch image", status_code=502)
+        if response is None:
+            raise ImageProxyError("Failed to fetch image", status_code=502)
 
+        try:
             response.raise_for_status()
 
             # Validate content type is an image
@@ -460,7 +531,20 @@ async def proxy_image(url: str):
             if not content_type.startswith("image/"):
                 raise ImageProxyError("URL does not point to an image", status_code=400)
 
-            return StreamingResponse(iter([response.content]), media_type=content_type)
+            # Reject oversized images from the headers, before any body is read
+            content_length = response.headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) > MAX_IMAGE_BYTES:
+                raise ImageProxyError("Image is too large", status_code=413)
+        except Exception:
+            await response.aclose()
+            raise
+
+        # Pass the body through as it arrives instead of buffering the whole image
+        return StreamingResponse(
+            iter_image_bytes(response),
+            media_type=content_type,
+            background=BackgroundTask(response.aclose),
+        )
     except ImageProxyError:
         raise
     except httpx.HTTPStatusError as e:
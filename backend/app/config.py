@@ -1,10 +1,12 @@
 """Configuration management"""
 
-import json
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 # Get the project root directory
 PROJECT_ROOT = Path(__file__).parent.parent
 CONFIG_DIR = PROJECT_ROOT / "config"
@@ -16,6 +18,21 @@ DATA_DIR.mkdir(exist_ok=True)
 LOGS_DIR.mkdir(exist_ok=True)
 
 
+@lru_cache(maxsize=8)
+def _read_bytes(path: str, mtime: float) -> bytes:  # noqa: ARG001
+    """Read a file, cached until its modification time changes"""
+    # mtime is only part of the cache key, so edits to the file invalidate it
+    return Path(path).read_bytes()
+
+
+def _load_json_file(path: Path) -> dict[str, Any] | None:
+    """Load a JSON file if it exists, reusing the file contents while unchanged"""
+    if not path.exists():
+        return None
+    # Parse on every call so each load gets its own dict to mutate
+    return orjson.loads(_read_bytes(str(path), path.stat().st_mtime))
+
+
 class Config:
     """Configuration manager"""
 
@@ -23,34 +40,43 @@ class Config:
         self.settings_path = CONFIG_DIR / "settings.json"
         self.scrapers_path = CONFIG_DIR / "scrapers.json"
         self.version_path = CONFIG_DIR / "version.json"
+        self.reload()
+
+    def reload(self):
+        """Reload configuration files; unchanged files are not read from disk again"""
         self.settings = self._load_settings()
         self.scrapers = self._load_scrapers()
         self.version = self._load_version()
+        self._precompute_settings()
+
+    def _precompute_settings(self):
+        """Flatten frequently read settings into attributes"""
+        self.enabled_merchants = frozenset(
+            merchant for merchant, enabled in self.settings.get("merchants", {}).items() if enabled
+        )
+        self.cache_enabled = bool(self.settings.get("cache", {}).get("enabled", True))
+        self.tax_enabled = bool(self.settings.get("tax", {}).get("enabled", True))
+        self.shipping_enabled = bool(self.settings.get("shipping", {}).get("enabled", True))
+        self.validation_enabled = bool(self.settings.get("validation", {}).get("enabled", True))
 
     def _load_settings(self) -> dict[str, Any]:
         """Load settings from JSON file"""
-        if self.settings_path.exists():
-            with open(self.settings_path) as f:
-                return json.load(f)
-        return {}
+        data = _load_json_file(self.settings_path)
+        return data if data is not None else {}
 
     def _load_scrapers(self) -> dict[str, Any]:
         """Load scraper configurations"""
-        if self.scrapers_path.exists():
-            with open(self.scrapers_path) as f:
-                return json.load(f)
-        return {}
+        data = _load_json_file(self.scrapers_path)
+        return data if data is not None else {}
 
     def _load_version(self) -> dict[str, Any]:
         """Load version information"""
-        if self.version_path.exists():
-            with open(self.version_path) as f:
-                return json.load(f)
-        return {"version": "0.1.0", "scrapers": {}}
+        data = _load_json_file(self.version_path)
+        return data if data is not None else {"version": "0.1.0", "scrapers": {}}
 
     def get_merchant_enabled(self, merchant: str) -> bool:
         """Check if a merchant is enabled"""
-        return self.settings.get("merchants", {}).get(merchant, False)
+        return merchant in self.enabled_merchants
 
     def get_scraper_config(self, merchant: str) -> dict[str, Any]:
         """Get scraper configuration for a merchant"""
@@ -64,10 +90,36 @@ class Config:
         """Get request timeout in seconds"""
         return self.settings.get("scraping", {}).get("timeout", 30)
 
+    def get_max_requests_per_minute(self) -> int:
+        """Get per-domain request cap over a sliding minute, 0 for no cap"""
+        return self.settings.get("scraping", {}).get("max_requests_per_minute", 0)
+
     def get_max_retries(self) -> int:
         """Get maximum retry attempts"""
         return self.settings.get("scraping", {}).get("max_retries", 3)
 
+    def get_max_concurrent_scrapers(self) -> int:
+        """Get maximum number of scrapers allowed to run at once"""
+        return self.settings.get("scraping", {}).get("max_concurrent_scrapers", 8)
+
+    def get_parse_workers(self) -> int:
+        """Get number of processes for parsing JS-rendered pages, 0 to parse in-process"""
+        return self.settings.get("scraping", {}).get("parse_workers", 2)
+
+    def get_browser_recycle_after(self) -> int:
+        """Get how many scrapes share one browser before it is relaunched"""
+        return self.settings.get("scraping", {}).get("browser_recycle_after", 100)
+
+    def get_browser_cdp_url(self) -> str:
+        """Get the CDP endpoint of a shared Chromium, empty to launch one locally"""
+        return os.getenv(
+            "BROWSER_CDP_URL", self.settings.get("scraping", {}).get("browser_cdp_url", "")
+        )
+
+    def get_warm_up_connections(self) -> bool:
+        """Get whether to open connections to HTTP merchants at startup"""
+        return self.settings.get("scraping", {}).get("warm_up_connections", False)
+
     def get_user_agents(self) -> list:
         """Get list of user agents"""
         return self.settings.get("scraping", {}).get("user_agents", [])
@@ -76,9 +128,17 @@ class Config:
         """Get cache TTL in hours"""
         return self.settings.get("cache", {}).get("ttl_hours", 1)
 
+    def get_memory_cache_ttl(self) -> int:
+        """Get in-memory search result cache TTL in seconds"""
+        return self.settings.get("cache", {}).get("memory_ttl_seconds", 300)
+
+    def get_memory_cache_size(self) -> int:
+        """Get maximum number of in-memory cached search results"""
+        return self.settings.get("cache", {}).get("memory_max_entries", 1024)
+
     def is_cache_enabled(self) -> bool:
         """Check if caching is enabled"""
-        return self.settings.get("cache", {}).get("enabled", True)
+        return self.cache_enabled
 
     def get_geolocation_api_key(self) -> str:
         """Get geolocation API key"""
@@ -86,21 +146,29 @@ class Config:
             "GEOLOCATION_API_KEY", self.settings.get("geolocation", {}).get("api_key", "")
         )
 
+    def get_log_level(self) -> str:
+        """Get log level"""
+        return os.getenv("LOG_LEVEL", self.settings.get("logging", {}).get("level", "INFO")).upper()
+
     def get_geolocation_provider(self) -> str:
         """Get geolocation provider"""
         return self.settings.get("geolocation", {}).get("provider", "ip-api.com")
 
+    def get_geolocation_cache_ttl(self) -> int:
+        """Get geolocation cache TTL in minutes"""
+        return self.settings.get("geolocation", {}).get("cache_ttl_minutes", 60)
+
     def is_tax_enabled(self) -> bool:
         """Check if tax calculation is enabled"""
-        return self.settings.get("tax", {}).get("enabled", True)
+        return self.tax_enabled
 
     def is_shipping_enabled(self) -> bool:
         """Check if shipping calculation is enabled"""
-        return self.settings.get("shipping", {}).get("enabled", True)
+        return self.shipping_enabled
 
     def is_validation_enabled(self) -> bool:
         """Check if search validation is enabled"""
-        return self.settings.get("validation", {}).get("enabled", True)
+        return self.validation_enabled
 
     def get_validation_cache_ttl(self) -> int:
         """Get validation cache TTL in minutes"""
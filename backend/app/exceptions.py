@@ -1,11 +1,41 @@
 """Custom exception classes for the CloseShave application"""
 
+from collections.abc import Mapping
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Any
 
+import orjson
+
+# Shared read-only details for the common case of an exception without any
+_EMPTY_DETAILS: Mapping[str, Any] = MappingProxyType({})
+
+
+@lru_cache(maxsize=64)
+def _error_prefix(error_code: str) -> bytes:
+    """Pre-serialized '{"error":<code>' prefix, shared by every error with that code"""
+    return orjson.dumps({"error": error_code})[:-1]
+
+
+def _rebuild_exception(
+    cls: type["CloseShaveException"],
+    message: str,
+    status_code: int,
+    error_code: str,
+    details: dict[str, Any],
+) -> "CloseShaveException":
+    """Recreate a pickled exception without going through the subclass __init__"""
+    exc = cls.__new__(cls)
+    CloseShaveException.__init__(exc, message, status_code, error_code, details)
+    return exc
+
 
 class CloseShaveException(Exception):
     """Base exception for all CloseShave exceptions"""
 
+    # Slots keep the attributes out of the (lazily created) instance __dict__
+    __slots__ = ("details", "error_code", "message", "status_code")
+
     def __init__(
         self,
         message: str,
@@ -16,9 +46,17 @@ class CloseShaveException(Exception):
         self.message = message
         self.status_code = status_code
         self.error_code = error_code or self.__class__.__name__
-        self.details = details or {}
+        self.details: Mapping[str, Any] = details or _EMPTY_DETAILS
         super().__init__(self.message)
 
+    def __reduce__(self):
+        # BaseException.__reduce__ only carries args and __dict__, which would drop
+        # the slotted attributes when errors cross a process boundary
+        return (
+            _rebuild_exception,
+            (type(self), self.message, self.status_code, self.error_code, dict(self.details)),
+        )
+
     def to_dict(self) -> dict[str, Any]:
         """Convert exception to dictionary for JSON response"""
         result = {
@@ -29,10 +67,19 @@ class CloseShaveException(Exception):
             result["details"] = self.details
         return result
 
+    def to_json_bytes(self) -> bytes:
+        """Serialize exception to the JSON response body"""
+        body = _error_prefix(self.error_code) + b',"message":' + orjson.dumps(self.message)
+        if self.details:
+            body += b',"details":' + orjson.dumps(self.details, option=orjson.OPT_NON_STR_KEYS)
+        return body + b"}"
+
 
 class ValidationError(CloseShaveException):
     """Raised when input validation fails"""
 
+    __slots__ = ()
+
     def __init__(self, message: str, details: dict[str, Any] | None = None):
         super().__init__(
             message=message, status_code=400, error_code="VALIDATION_ERROR", details=details
@@ -42,37 +89,41 @@ class ValidationError(CloseShaveException):
 class ScraperError(CloseShaveException):
     """Raised when a scraper encounters an error"""
 
+    __slots__ = ()
+
     def __init__(
         self, message: str, merchant: str | None = None, details: dict[str, Any] | None = None
     ):
-        error_details = details or {}
         if merchant:
-            error_details["merchant"] = merchant
+            details = {**(details or {}), "merchant": merchant}
         super().__init__(
-            message=message, status_code=502, error_code="SCRAPER_ERROR", details=error_details
+            message=message, status_code=502, error_code="SCRAPER_ERROR", details=details
         )
 
 
 class RateLimitError(CloseShaveException):
     """Raised when rate limit is exceeded"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "Rate limit exceeded",
         retry_after: int | None = None,
         details: dict[str, Any] | None = None,
     ):
-        error_details = details or {}
         if retry_after:
-            error_details["retry_after"] = retry_after
+            details = {**(details or {}), "retry_after": retry_after}
         super().__init__(
-            message=message, status_code=429, error_code="RATE_LIMIT_ERROR", details=error_details
+            message=message, status_code=429, error_code="RATE_LIMIT_ERROR", details=details
         )
 
 
 class DatabaseError(CloseShaveException):
     """Raised when database operations fail"""
 
+    __slots__ = ()
+
     def __init__(self, message: str, details: dict[str, Any] | None = None):
         super().__init__(
             message=message, status_code=500, error_code="DATABASE_ERROR", details=details
@@ -82,6 +133,8 @@ class DatabaseError(CloseShaveException):
 class ConfigurationError(CloseShaveException):
     """Raised when configuration is invalid or missing"""
 
+    __slots__ = ()
+
     def __init__(self, message: str, details: dict[str, Any] | None = None):
         super().__init__(
             message=message, status_code=500, error_code="CONFIGURATION_ERROR", details=details
@@ -91,6 +144,8 @@ class ConfigurationError(CloseShaveException):
 class ImageProxyError(CloseShaveException):
     """Raised when image proxy operations fail"""
 
+    __slots__ = ()
+
     def __init__(self, message: str, status_code: int = 502, details: dict[str, Any] | None = None):
         super().__init__(
             message=message,
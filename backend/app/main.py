@@ -1,98 +1,170 @@
 """FastAPI main application"""
 
+import asyncio
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-from fastapi import FastAPI, Request
+import orjson
+from fastapi import FastAPI, Request, Response
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 
-from app.api.routes import router
+from app.api.routes import AVAILABLE_MERCHANTS, SCRAPERS, router
 from app.config import LOGS_DIR, config
 from app.exceptions import CloseShaveException
+from app.responses import ORJSONResponse
+from app.scrapers.base import get_request_headers, parse_origin
+from app.scrapers.parse_pool import parse_pool
+from app.utils.browser import browser_pool
 from app.utils.database import db
+from app.utils.http_client import http_client_pool
+from app.utils.rate_limiter import rate_limiter
 
 # Set up logging
 LOGS_DIR.mkdir(exist_ok=True)
 log_file = LOGS_DIR / "scraper.log"
 
 # Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=7),
-        logging.StreamHandler(),
-    ],
-)
+# Records are queued on the event loop and written to the console and the
+# rotating file by a background thread, so disk I/O never blocks requests
+log_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+log_handlers = [
+    RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=7),
+    logging.StreamHandler(),
+]
+for log_handler in log_handlers:
+    log_handler.setFormatter(log_formatter)
+
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# The queue handler only renders the message; the listener's handlers add the layout
+queue_handler = QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=config.get_log_level(), handlers=[queue_handler])
 
 logger = logging.getLogger(__name__)
 
-# Create FastAPI app
-app = FastAPI(
-    title="CloseShave Web Scraper API",
-    description="API for searching products across multiple merchants",
-    version=config.version.get("version", "0.1.0"),
+# The app version and root payload are fixed for the life of the process
+APP_VERSION = config.version.get("version", "0.1.0")
+ROOT_BODY = orjson.dumps(
+    {"name": "CloseShave Web Scraper API", "version": APP_VERSION, "status": "running"}
 )
 
-# CORS middleware
-# Allow requests from localhost (dev) and from frontend container (Docker)
-cors_origins = [
-    "http://localhost:5173",
-    "http://localhost:3000",
-    "http://127.0.0.1:5173",
-    "http://localhost",  # Docker frontend on port 80
-    "http://localhost:80",
-    "http://frontend",  # Docker service name
-]
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=cors_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-# Include routers
-app.include_router(router)
+def get_warm_up_urls() -> list[str]:
+    """Get the base URLs of enabled merchants scraped over plain HTTP"""
+    return [
+        SCRAPERS[merchant].BASE_URL
+        for merchant in AVAILABLE_MERCHANTS
+        if config.get_merchant_enabled(merchant)
+        and not config.get_scraper_config(merchant).get("requires_js", False)
+        and SCRAPERS[merchant].BASE_URL
+    ]
+
+
+async def warm_up_connections(urls: list[str]):
+    """Open pooled connections to merchants, within robots.txt and their rate limits"""
+
+    async def may_request(url: str) -> bool:
+        if not await rate_limiter.check_robots_txt(url):
+            return False
+        await rate_limiter.wait_if_needed(parse_origin(url))
+        return True
+
+    allowed = await asyncio.gather(*(may_request(url) for url in urls))
+    await http_client_pool.warm_up(
+        [url for url, ok in zip(urls, allowed, strict=True) if ok], headers=get_request_headers()
+    )
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize on startup"""
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Initialize shared resources on startup and release them on shutdown"""
     logger.info("Starting CloseShave Web Scraper API")
     try:
         await db.init_db()
         logger.info("Database initialized")
         await db.cleanup_expired()
         logger.info("Cleaned up expired cache entries")
+        http_client_pool.get_client()
+        logger.info("HTTP client pool ready (http2=%s)", http_client_pool.http2)
     except Exception as e:
-        logger.error(f"Error during startup: {e}", exc_info=True)
+        logger.error("Error during startup: %s", e, exc_info=True)
         raise
 
+    # Optionally resolve and connect to the plain-HTTP merchants in the background
+    # so the first search doesn't pay for DNS, TCP and TLS on every host
+    warm_up_task = None
+    if config.get_warm_up_connections():
+        warm_up_task = asyncio.create_task(warm_up_connections(get_warm_up_urls()))
+
+    yield
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup on shutdown"""
     logger.info("Shutting down CloseShave Web Scraper API")
+    if warm_up_task is not None:
+        warm_up_task.cancel()
+    await http_client_pool.close()
+    await browser_pool.close()
+    parse_pool.close()
+    await db.close()
+
+
+# Create FastAPI app
+app = FastAPI(
+    title="CloseShave Web Scraper API",
+    description="API for searching products across multiple merchants",
+    version=APP_VERSION,
+    lifespan=lifespan,
+)
+
+# CORS middleware
+# Allow requests from localhost (dev) and from frontend container (Docker)
+cors_origins = frozenset(
+    {
+        "http://localhost:5173",
+        "http://localhost:3000",
+        "http://127.0.0.1:5173",
+        "http://localhost",  # Docker frontend on port 80
+        "http://localhost:80",
+        "http://frontend",  # Docker service name
+    }
+)
+# Explicit methods/headers (the frontend only sends JSON GET/POST) let the
+# middleware answer preflights with precomputed headers, which browsers may
+# then cache for max_age seconds
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=cors_origins,
+    allow_credentials=True,
+    allow_methods=("GET", "POST", "OPTIONS"),
+    allow_headers=("Accept", "Content-Type", "Authorization"),
+    max_age=86400,
+)
+
+# Include routers
+app.include_router(router)
 
 
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {
-        "name": "CloseShave Web Scraper API",
-        "version": config.version.get("version", "0.1.0"),
-        "status": "running",
-    }
+    return Response(content=ROOT_BODY, media_type="application/json")
 
 
 @app.exception_handler(CloseShaveException)
 async def closeshave_exception_handler(request: Request, exc: CloseShaveException):
     """Handle CloseShave custom exceptions"""
     logger.warning(
-        f"CloseShave exception: {exc.error_code} - {exc.message}",
+        "CloseShave exception: %s - %s",
+        exc.error_code,
+        exc.message,
         extra={
             "error_code": exc.error_code,
             "status_code": exc.status_code,
@@ -101,21 +173,24 @@ async def closeshave_exception_handler(request: Request, exc: CloseShaveExceptio
             "method": request.method,
         },
     )
-    return JSONResponse(status_code=exc.status_code, content=exc.to_dict())
+    return Response(
+        content=exc.to_json_bytes(), status_code=exc.status_code, media_type="application/json"
+    )
 
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle request validation errors"""
     logger.warning(
-        f"Validation error: {exc.errors()}",
+        "Validation error: %s",
+        exc.errors(),
         extra={
             "path": request.url.path,
             "method": request.method,
             "errors": exc.errors(),
         },
     )
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content={
             "error": "VALIDATION_ERROR",
@@ -129,7 +204,9 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler for unhandled exceptions"""
     logger.error(
-        f"Unhandled exception: {type(exc).__name__}: {exc}",
+        "Unhandled exception: %s: %s",
+        type(exc).__name__,
+        exc,
         exc_info=True,
         extra={
             "path": request.url.path,
@@ -137,7 +214,7 @@ async def global_exception_handler(request: Request, exc: Exception):
             "exception_type": type(exc).__name__,
         },
     )
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"error": "INTERNAL_SERVER_ERROR", "message": "An unexpected error occurred"},
     )
@@ -1,63 +1,157 @@
 """Base scraper class"""
 
 import logging
-from abc import ABC, abstractmethod
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
 
 import httpx
-from bs4 import BeautifulSoup
-from playwright.async_api import Browser, Page, async_playwright
+from cssselect import HTMLTranslator
+from lxml import etree
+from lxml import html as lxml_html
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from app.config import config
 from app.models import Product
-from app.utils.price_parser import PriceParser
-from app.utils.rate_limiter import RateLimiter
+from app.scrapers.parse_pool import parse_pool
+from app.utils.browser import browser_pool
+from app.utils.http_client import http_client_pool
+from app.utils.price_parser import PriceParser, parse_price
+from app.utils.rate_limiter import rate_limiter
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page, Route
 
 logger = logging.getLogger(__name__)
 
+_css_translator = HTMLTranslator()
+
+# Availability keywords, matched case-insensitively anywhere in the text
+OUT_OF_STOCK_RE = re.compile(r"out of stock|unavailable|sold out", re.IGNORECASE)
+LIMITED_STOCK_RE = re.compile(r"limited|few left|only", re.IGNORECASE)
+
+# How long to wait for the results container on JS-rendered pages
+PLAYWRIGHT_RESULTS_TIMEOUT_MS = 8000
+
+# Chunk size used when streaming search pages into the incremental parser
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Resources the parser never looks at; skipping them cuts page load time
+BLOCKED_RESOURCE_TYPES = frozenset({"font", "image", "media", "stylesheet"})
+
+
+@lru_cache(maxsize=256)
+def compile_css_selector(css: str) -> etree.XPath:
+    """Translate a CSS selector into a compiled XPath over an element's descendants
+
+    Scrapers are instantiated per search, so compiled selectors are memoized and
+    shared across instances instead of being rebuilt on every request.
+    """
+    return etree.XPath(_css_translator.css_to_xpath(css, prefix="descendant::"))
+
+
+@lru_cache(maxsize=64)
+def compile_css_matcher(css: str) -> etree.XPath:
+    """Translate a CSS selector into a compiled XPath testing the element itself"""
+    return etree.XPath(_css_translator.css_to_xpath(css, prefix="self::"))
+
+
+@lru_cache(maxsize=32)
+def parse_origin(url: str) -> str:
+    """Get the scheme://netloc origin of a URL, memoized for the few merchant base URLs"""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def get_request_headers() -> dict[str, str]:
+    """Get the headers plain-HTTP scrapers send to merchants"""
+    user_agents = config.get_user_agents()
+    return {
+        "User-Agent": user_agents[0]
+        if user_agents
+        else "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    }
+
+
+async def block_nonessential_resources(route: "Route"):
+    """Abort requests for resources that don't affect the scraped DOM"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
 
-class BaseScraper(ABC):
+class BaseScraper:
     """Base class for all merchant scrapers"""
 
+    # Fallback CSS selectors, overridden by the merchant's scrapers.json entry
+    DEFAULT_SELECTORS: dict[str, str] = {}
+    # Origin that relative links and image URLs are resolved against
+    BASE_URL = ""
+
     def __init__(self, merchant_name: str):
         self.merchant_name = merchant_name
         self.config = config.get_scraper_config(merchant_name)
-        self.rate_limiter = RateLimiter(config.get_request_delay())
+        self.rate_limiter = rate_limiter
         self.price_parser = PriceParser()
         self.requires_js = self.config.get("requires_js", False)
-        self.selectors = self.config.get("selectors", {})
-        self.browser: Browser | None = None
+        self.selectors = {**self.DEFAULT_SELECTORS, **self.config.get("selectors", {})}
+        # Compile every CSS selector to XPath once instead of per element
+        self._xpaths = {
+            name: compile_css_selector(css)
+            for name, css in self.selectors.items()
+            if name != "search_url"
+        }
+        # Tests single elements as the streaming parser closes them
+        container_css = self.selectors.get("product_container")
+        self._container_matcher = compile_css_matcher(container_css) if container_css else None
+        # Split the search URL around its placeholder so building it is a concatenation
+        url_template = self.selectors.get("search_url", "")
+        self._search_url_prefix, _, self._search_url_suffix = url_template.partition("{query}")
+        self.context: BrowserContext | None = None
         self.page: Page | None = None
 
     async def __aenter__(self):
         """Async context manager entry"""
         if self.requires_js:
-            playwright = await async_playwright().start()
-            self.browser = await playwright.chromium.launch(headless=True)
-            self.page = await self.browser.new_page()
+            # Each scraper gets its own cheap context on the shared browser
+            self.context = await browser_pool.acquire()
+            self.page = await self.context.new_page()
+            await self.page.route("**/*", block_nonessential_resources)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self.browser:
-            await self.browser.close()
+        if self.context:
+            await browser_pool.release(self.context)
+            self.context = None
+            self.page = None
 
     def get_search_url(self, query: str) -> str:
         """Get search URL for query"""
-        url_template = self.selectors.get("search_url", "")
-        return url_template.format(query=query.replace(" ", "+"))
+        return self._search_url_prefix + query.replace(" ", "+") + self._search_url_suffix
 
     async def search(self, query: str, max_results: int = 20) -> list[Product]:
-        """Search for products"""
-        search_url = self.get_search_url(query)
-        domain = self._get_domain(search_url)
-
-        # Check robots.txt and rate limit
-        allowed = await self.rate_limiter.check_robots_txt(search_url)
-        if not allowed:
+        """Search for products, respecting robots.txt and rate limits"""
+        if not await self.wait_for_turn(query):
             return []
+        return await self.fetch(query, max_results)
+
+    async def wait_for_turn(self, query: str) -> bool:
+        """Check robots.txt and wait for this merchant's rate-limit slot
 
-        await self.rate_limiter.wait_if_needed(domain)
+        Returns False if robots.txt disallows the search.
+        """
+        search_url = self.get_search_url(query)
+        if not await self.rate_limiter.check_robots_txt(search_url):
+            return False
+        await self.rate_limiter.wait_if_needed(self._get_domain(search_url))
+        return True
 
+    async def fetch(self, query: str, max_results: int = 20) -> list[Product]:
+        """Fetch and parse search results; callers handle robots.txt and rate limits"""
+        search_url = self.get_search_url(query)
         try:
             if self.requires_js:
                 return await self._search_with_playwright(search_url, max_results)
@@ -68,56 +162,165 @@ class BaseScraper(ABC):
             return []
 
     async def _search_with_requests(self, url: str, max_results: int) -> list[Product]:
-        """Search using requests and BeautifulSoup"""
-        user_agents = config.get_user_agents()
-        headers = {
-            "User-Agent": user_agents[0]
-            if user_agents
-            else "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-
-        async with httpx.AsyncClient(timeout=config.get_timeout(), headers=headers) as client:
-            response = await client.get(url)
+        """Search using requests and lxml"""
+        client = http_client_pool.get_client()
+        request = client.build_request(
+            "GET", url, headers=get_request_headers(), timeout=config.get_timeout()
+        )
+        response = await client.send(request, stream=True)
+        self.rate_limiter.report_response(self._get_domain(url), response.status_code)
+        try:
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, "lxml")
-            return self._parse_results(soup, max_results)
+            tree = await self._parse_stream(response, max_results)
+        finally:
+            await response.aclose()
+        return self._parse_results(tree, max_results)
+
+    async def _parse_stream(
+        self, response: httpx.Response, max_results: int
+    ) -> lxml_html.HtmlElement:
+        """Parse HTML as it downloads, stopping once enough results are in"""
+        is_container = self._container_matcher
+        # Without a container selector there is nothing to count, so skip the events
+        parser = etree.HTMLPullParser(events=("end",) if is_container is not None else ())
+        parser.set_element_class_lookup(lxml_html.HtmlElementClassLookup())
+        found = 0
+        async for chunk in response.aiter_bytes(chunk_size=STREAM_CHUNK_SIZE):
+            parser.feed(chunk)
+            if is_container is None:
+                continue
+            # Each element is looked at once, when it closes; a closed container
+            # is complete, so it can be checked for a usable title right away
+            for _, element in parser.read_events():
+                if is_container(element) and self._is_result(element):
+                    found += 1
+            if found >= max_results:
+                break
+        return parser.close()
+
+    def _is_result(self, container) -> bool:
+        """Whether a container holds a titled product rather than a placeholder"""
+        title = self._extract_text(self._select_one("title", container))
+        return bool(title) and not self._skip_result(container, title)
 
     async def _search_with_playwright(self, url: str, max_results: int) -> list[Product]:
         """Search using Playwright"""
         if not self.page:
             raise RuntimeError("Playwright page not initialized")
 
-        await self.page.goto(url, wait_until="networkidle")
-        await self.page.wait_for_timeout(2000)  # Wait for JS to render
-
+        # Continue as soon as results render rather than waiting for the
+        # network to go quiet; without a container selector that is all we have
+        container = self.selectors.get("product_container")
+        response = await self.page.goto(
+            url, wait_until="domcontentloaded" if container else "networkidle"
+        )
+        if response is not None:
+            self.rate_limiter.report_response(self._get_domain(url), response.status)
+        if container:
+            try:
+                await self.page.wait_for_selector(
+                    container, state="attached", timeout=PLAYWRIGHT_RESULTS_TIMEOUT_MS
+                )
+            except PlaywrightTimeoutError:
+                logger.debug("No results rendered for %s, parsing page as-is", self.merchant_name)
+
+        # Rendered pages are large; parse them off the event loop
         html = await self.page.content()
-        soup = BeautifulSoup(html, "lxml")
-        return self._parse_results(soup, max_results)
-
-    @abstractmethod
-    def _parse_results(self, soup: BeautifulSoup, max_results: int) -> list[Product]:
-        """Parse search results from BeautifulSoup"""
+        return await parse_pool.parse(self, html, max_results)
+
+    def _parse_results(self, tree: lxml_html.HtmlElement, max_results: int) -> list[Product]:
+        """Parse search results from an lxml HTML tree using the merchant's selectors"""
+        products = []
+        # Look past max_results containers so skipped or broken ones are backfilled,
+        # and stop as soon as enough products are parsed
+        containers = self._select("product_container", tree)[: max_results * 2]
+
+        for container in containers:
+            if len(products) >= max_results:
+                break
+            try:
+                # Title
+                title = self._extract_text(self._select_one("title", container))
+                if not title or self._skip_result(container, title):
+                    continue
+
+                # Price
+                base_price = self._extract_price(self._select_one("price", container)) or 0.0
+
+                # Image and link
+                image_url = self._extract_image_url(
+                    self._select_one("image", container), self.BASE_URL
+                )
+                product_url = self._extract_url(self._select_one("link", container), self.BASE_URL)
+
+                # Availability
+                availability = self._determine_availability(
+                    self._select_one("availability", container)
+                )
+
+                product = Product(
+                    title=title,
+                    price=base_price,
+                    base_price=base_price,
+                    shipping_cost=0.0,
+                    tax=0.0,
+                    total_price=base_price,
+                    image_url=image_url,
+                    direct_image_url=image_url,
+                    product_url=product_url,
+                    merchant=self.merchant_name,
+                    availability=availability,
+                    merchant_id=self._get_merchant_id(container),
+                )
+                products.append(product)
+            except Exception:
+                continue
+
+        return products
+
+    def _skip_result(self, container, title: str) -> bool:  # noqa: ARG002
+        """Whether a container is a placeholder (ads, headers) rather than a product"""
+        return False
+
+    def _get_merchant_id(self, container) -> str | None:  # noqa: ARG002
+        """Merchant's own product ID for a container, if it exposes one"""
+        return None
+
+    def _select(self, name: str, element) -> list:
+        """Find all descendants of element matching the named selector"""
+        xpath = self._xpaths.get(name)
+        return xpath(element) if xpath is not None else []
+
+    def _select_one(self, name: str, element):
+        """Find the first descendant of element matching the named selector"""
+        xpath = self._xpaths.get(name)
+        if xpath is None:
+            return None
+        matches = xpath(element)
+        return matches[0] if matches else None
 
     def _get_domain(self, url: str) -> str:
         """Extract domain from URL"""
-        from urllib.parse import urlparse
-
-        parsed = urlparse(url)
-        return f"{parsed.scheme}://{parsed.netloc}"
+        return parse_origin(url)
 
     def _extract_price(self, element) -> float | None:
         """Extract price from element"""
-        if not element:
+        if element is None:
             return None
 
-        price_text = element.get_text(strip=True) if hasattr(element, "get_text") else str(element)
-        return self.price_parser.parse_price(price_text)
+        # The price regex ignores whitespace, so skip _extract_text's normalization
+        if hasattr(element, "text_content"):
+            return parse_price(element.text_content())
+        return parse_price(self._extract_text(element))
 
     def _extract_text(self, element, default: str = "") -> str:
         """Extract text from element"""
-        if not element:
+        if element is None:
             return default
-        return element.get_text(strip=True) if hasattr(element, "get_text") else str(element)
+        if hasattr(element, "text_content"):
+            # Collapse the whitespace lxml keeps between inline elements
+            return " ".join(element.text_content().split())
+        return str(element)
 
     def _resolve_url(self, url: str, base_url: str = "") -> str:
         """Resolve relative URL to absolute URL"""
@@ -127,16 +330,13 @@ class BaseScraper(ABC):
         if url.startswith("http"):
             return url
         elif url.startswith("/"):
-            from urllib.parse import urlparse
-
-            parsed = urlparse(base_url)
-            return f"{parsed.scheme}://{parsed.netloc}{url}"
+            return parse_origin(base_url) + url
         else:
             return f"{base_url}/{url}" if base_url else url
 
     def _extract_url(self, element, base_url: str = "") -> str:
         """Extract URL from element"""
-        if not element:
+        if element is None:
             return ""
 
         if hasattr(element, "get"):
@@ -148,7 +348,7 @@ class BaseScraper(ABC):
 
     def _extract_image_url(self, element, base_url: str = "") -> str:
         """Extract image URL from element"""
-        if not element:
+        if element is None:
             return ""
 
         if hasattr(element, "get"):
@@ -160,12 +360,12 @@ class BaseScraper(ABC):
 
     def _determine_availability(self, element) -> str:
         """Determine product availability"""
-        if not element:
+        if element is None:
             return "in_stock"
 
-        text = self._extract_text(element).lower()
-        if any(word in text for word in ["out of stock", "unavailable", "sold out"]):
+        text = self._extract_text(element)
+        if OUT_OF_STOCK_RE.search(text):
             return "out_of_stock"
-        elif any(word in text for word in ["limited", "few left", "only"]):
+        elif LIMITED_STOCK_RE.search(text):
             return "limited"
         return "in_stock"
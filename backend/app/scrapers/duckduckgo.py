@@ -1,6 +1,8 @@
 """DuckDuckGo scraper"""
 
+import asyncio
 import logging
+
 from duckduckgo_search import DDGS
 
 from app.models import Product
@@ -17,7 +19,11 @@ class DuckDuckGoScraper(BaseScraper):
         super().__init__("duckduckgo")
         self.ddgs = DDGS()
 
-    async def search(self, query: str, max_results: int = 20) -> list[Product]:
+    async def wait_for_turn(self, query: str) -> bool:  # noqa: ARG002
+        """DDGS talks to DuckDuckGo itself; there is no merchant page to rate limit"""
+        return True
+
+    async def fetch(self, query: str, max_results: int = 20) -> list[Product]:
         """Search for products using DuckDuckGo"""
         results = []
         try:
@@ -27,7 +33,10 @@ class DuckDuckGoScraper(BaseScraper):
             
             # Use text search as it's the most reliable entry point
             # In a real scenario, we might want to use 'shopping' if available and reliable
-            ddg_results = self.ddgs.text(search_query, max_results=max_results)
+            # DDGS is blocking, so run it on a worker thread to keep the other scrapers going
+            ddg_results = await asyncio.to_thread(
+                self.ddgs.text, search_query, max_results=max_results
+            )
             
             for r in ddg_results:
                 title = r.get("title", "")
@@ -72,7 +81,3 @@ class DuckDuckGoScraper(BaseScraper):
             logger.error(f"Error searching DuckDuckGo: {e}", exc_info=True)
             
         return results
-
-    def _parse_results(self, soup, max_results):
-        """Not used for DuckDuckGo"""
-        return []
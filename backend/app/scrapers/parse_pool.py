@@ -0,0 +1,57 @@
+"""Process pool for CPU-bound parsing of rendered search pages"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+from lxml import html as lxml_html
+
+from app.config import config
+from app.models import Product
+
+if TYPE_CHECKING:
+    from app.scrapers.base import BaseScraper
+
+# Scraper instances reused by each worker process, keyed by class
+_worker_scrapers: dict[type, "BaseScraper"] = {}
+
+
+def parse_html(scraper_class: type["BaseScraper"], html: str, max_results: int) -> list[Product]:
+    """Parse a search page with the given scraper's selectors"""
+    scraper = _worker_scrapers.get(scraper_class)
+    if scraper is None:
+        scraper = _worker_scrapers[scraper_class] = scraper_class()
+    return scraper._parse_results(lxml_html.fromstring(html), max_results)
+
+
+class ParsePool:
+    """Runs parse_html in worker processes so parsing doesn't hold the event loop's GIL"""
+
+    def __init__(self):
+        self.max_workers = config.get_parse_workers()
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def parse(self, scraper: "BaseScraper", html: str, max_results: int) -> list[Product]:
+        """Parse html for scraper, in a worker process when the pool is enabled"""
+        if self.max_workers <= 0:
+            return scraper._parse_results(lxml_html.fromstring(html), max_results)
+        if self._executor is None:
+            # Spawn rather than fork: the app runs threads (log listener, Playwright)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, parse_html, type(scraper), html, max_results
+        )
+
+    def close(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global parse pool
+parse_pool = ParsePool()
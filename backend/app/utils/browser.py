@@ -0,0 +1,105 @@
+"""Shared Playwright browser"""
+
+import asyncio
+
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+
+from app.config import config
+
+# Skip subsystems a headless scraper never uses; /dev/shm is tiny in containers
+CHROMIUM_ARGS = [
+    "--disable-background-networking",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-gpu",
+]
+
+
+class BrowserPool:
+    """Single headless Chromium shared by all JS scrapers
+
+    Scrapers borrow a fresh BrowserContext per search. After recycle_after
+    contexts the browser is retired, so one long-lived Chromium can't grow
+    without bound, and closed once its last borrowed context is released.
+    A Chromium attached over CDP is never recycled: reconnecting wouldn't
+    restart it, and its default context means it never looks idle.
+    """
+
+    def __init__(self):
+        self.recycle_after = config.get_browser_recycle_after()
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._contexts_served = 0
+        self._lock: asyncio.Lock | None = None
+        # Playwright objects belong to the event loop that started them
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def get_browser(self) -> Browser:
+        """Get the shared browser, launching it on first use"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Started on another (possibly closed) loop; start afresh on this one
+            self._reset(loop)
+        elif self._browser is not None and self._browser.is_connected():
+            return self._browser
+
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                self._browser = await self._launch()
+                self._contexts_served = 0
+        return self._browser
+
+    async def acquire(self) -> BrowserContext:
+        """Open a fresh context on the shared browser"""
+        browser = await self.get_browser()
+        context = await browser.new_context()
+        self._contexts_served += 1
+        if (
+            self._contexts_served >= self.recycle_after
+            and browser is self._browser
+            and not config.get_browser_cdp_url()
+        ):
+            # Retire it; the next acquire launches a replacement
+            self._browser = None
+        return context
+
+    async def release(self, context: BrowserContext):
+        """Close a borrowed context, and its browser if that has been retired"""
+        browser = context.browser
+        await context.close()
+        if browser is not None and browser is not self._browser and not browser.contexts:
+            await browser.close()
+
+    async def close(self):
+        """Close the browser and stop Playwright"""
+        if self._loop is not asyncio.get_running_loop():
+            self._reset(None)
+            return
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _launch(self) -> Browser:
+        """Launch a headless Chromium, or attach to a shared one over CDP"""
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        cdp_url = config.get_browser_cdp_url()
+        if cdp_url:
+            # One Chromium serves every worker process; contexts keep scrapes isolated
+            return await self._playwright.chromium.connect_over_cdp(cdp_url)
+        return await self._playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+
+    def _reset(self, loop: asyncio.AbstractEventLoop | None):
+        """Forget state owned by a previous event loop"""
+        self._playwright = None
+        self._browser = None
+        self._contexts_served = 0
+        self._lock = asyncio.Lock()
+        self._loop = loop
+
+
+# Global browser pool
+browser_pool = BrowserPool()
@@ -1,11 +1,11 @@
 """Database utilities for caching"""
 
-import json
-from datetime import datetime, timedelta
+import asyncio
 from pathlib import Path
 from typing import Any
 
 import aiosqlite
+import orjson
 
 from app.config import DATA_DIR
 
@@ -16,76 +16,120 @@ class Database:
     def __init__(self, db_path: Path | None = None):
         self.db_path = db_path or (DATA_DIR / "cache.db")
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One long-lived connection; aiosqlite runs its calls in order on one thread
+        self._conn: aiosqlite.Connection | None = None
+        self._connect_lock: asyncio.Lock | None = None
+
+    async def _get_connection(self) -> aiosqlite.Connection:
+        """Get the shared connection, opening it on first use"""
+        if self._conn is not None:
+            return self._conn
+
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._conn is None:
+                conn = await aiosqlite.connect(self.db_path)
+                conn.row_factory = aiosqlite.Row
+                # WAL lets reads run alongside writes; NORMAL sync is durable enough with WAL
+                await conn.execute("PRAGMA journal_mode=WAL")
+                await conn.execute("PRAGMA synchronous=NORMAL")
+                await conn.execute("PRAGMA temp_store=MEMORY")
+                await conn.execute("PRAGMA mmap_size=268435456")
+                self._conn = conn
+        return self._conn
+
+    async def close(self):
+        """Close the shared connection"""
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
 
     async def init_db(self):
         """Initialize database tables"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Search cache table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS search_cache (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    query TEXT NOT NULL,
-                    merchant TEXT NOT NULL,
-                    cache_key TEXT NOT NULL UNIQUE,
-                    data TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    expires_at TIMESTAMP NOT NULL
-                )
-            """)
-
-            # Products table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS products (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    merchant TEXT NOT NULL,
-                    merchant_id TEXT,
-                    title TEXT NOT NULL,
-                    price REAL NOT NULL,
-                    base_price REAL NOT NULL,
-                    shipping_cost REAL DEFAULT 0.0,
-                    tax REAL DEFAULT 0.0,
-                    total_price REAL NOT NULL,
-                    image_url TEXT,
-                    direct_image_url TEXT,
-                    product_url TEXT NOT NULL,
-                    availability TEXT DEFAULT 'in_stock',
-                    brand TEXT,
-                    rating REAL,
-                    review_count INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # Create indexes
-            await db.execute("""
-                CREATE INDEX IF NOT EXISTS idx_cache_key ON search_cache(cache_key)
-            """)
-            await db.execute("""
-                CREATE INDEX IF NOT EXISTS idx_cache_expires ON search_cache(expires_at)
-            """)
-            await db.execute("""
-                CREATE INDEX IF NOT EXISTS idx_products_merchant ON products(merchant)
-            """)
-
-            await db.commit()
+        db = await self._get_connection()
+
+        # Search cache table
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS search_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT NOT NULL,
+                merchant TEXT NOT NULL,
+                cache_key TEXT NOT NULL UNIQUE,
+                data TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                expires_at TIMESTAMP NOT NULL
+            )
+        """)
+
+        # Products table
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS products (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                merchant TEXT NOT NULL,
+                merchant_id TEXT,
+                title TEXT NOT NULL,
+                price REAL NOT NULL,
+                base_price REAL NOT NULL,
+                shipping_cost REAL DEFAULT 0.0,
+                tax REAL DEFAULT 0.0,
+                total_price REAL NOT NULL,
+                image_url TEXT,
+                direct_image_url TEXT,
+                product_url TEXT NOT NULL,
+                availability TEXT DEFAULT 'in_stock',
+                brand TEXT,
+                rating REAL,
+                review_count INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # robots.txt cache table
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS robots_cache (
+                domain TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                expires_at TIMESTAMP NOT NULL
+            )
+        """)
+
+        # Create indexes
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_cache_key ON search_cache(cache_key)
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_cache_expires ON search_cache(expires_at)
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_products_merchant ON products(merchant)
+        """)
+
+        await db.commit()
 
     async def get_cached_search(self, cache_key: str) -> list[dict[str, Any]] | None:
         """Get cached search results"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute(
-                """
-                SELECT data, expires_at FROM search_cache
-                WHERE cache_key = ? AND expires_at > datetime('now')
-            """,
-                (cache_key,),
-            )
+        data = await self.get_cached_search_json(cache_key)
+        if data:
+            return orjson.loads(data)
+        return None
+
+    async def get_cached_search_json(self, cache_key: str) -> str | None:
+        """Get cached search results as the stored JSON document"""
+        db = await self._get_connection()
+        async with db.execute(
+            """
+            SELECT data, expires_at FROM search_cache
+            WHERE cache_key = ? AND expires_at > datetime('now')
+        """,
+            (cache_key,),
+        ) as cursor:
             row = await cursor.fetchone()
 
-            if row:
-                return json.loads(row["data"])
-            return None
+        if row:
+            return row["data"]
+        return None
 
     async def cache_search(
         self,
@@ -96,57 +140,88 @@ class Database:
         ttl_hours: int = 1,
     ):
         """Cache search results"""
-        expires_at = datetime.now() + timedelta(hours=ttl_hours)
-
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """
-                INSERT OR REPLACE INTO search_cache 
-                (query, merchant, cache_key, data, expires_at)
-                VALUES (?, ?, ?, ?, ?)
-            """,
-                (query, merchant, cache_key, json.dumps(data), expires_at.isoformat()),
-            )
-            await db.commit()
+        # Compute expiry in SQLite so it uses the same clock and format as the
+        # datetime('now') comparisons used on read and cleanup
+        db = await self._get_connection()
+        await db.execute(
+            """
+            INSERT OR REPLACE INTO search_cache
+            (query, merchant, cache_key, data, expires_at)
+            VALUES (?, ?, ?, ?, datetime('now', ?))
+        """,
+            (query, merchant, cache_key, orjson.dumps(data).decode(), f"+{ttl_hours} hours"),
+        )
+        await db.commit()
+
+    async def get_cached_robots_txt(self, domain: str) -> str | None:
+        """Get a cached robots.txt body for a domain"""
+        db = await self._get_connection()
+        async with db.execute(
+            """
+            SELECT body FROM robots_cache
+            WHERE domain = ? AND expires_at > datetime('now')
+        """,
+            (domain,),
+        ) as cursor:
+            row = await cursor.fetchone()
+
+        if row:
+            return row["body"]
+        return None
+
+    async def cache_robots_txt(self, domain: str, body: str, ttl_hours: int = 24):
+        """Cache a domain's robots.txt body"""
+        db = await self._get_connection()
+        await db.execute(
+            """
+            INSERT OR REPLACE INTO robots_cache (domain, body, expires_at)
+            VALUES (?, ?, datetime('now', ?))
+        """,
+            (domain, body, f"+{ttl_hours} hours"),
+        )
+        await db.commit()
 
     async def save_product(self, product: dict[str, Any]):
         """Save or update a product"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """
-                INSERT OR REPLACE INTO products 
-                (merchant, merchant_id, title, price, base_price, shipping_cost, 
-                 tax, total_price, image_url, direct_image_url, product_url, 
-                 availability, brand, rating, review_count, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-            """,
-                (
-                    product.get("merchant"),
-                    product.get("merchant_id"),
-                    product.get("title"),
-                    product.get("price"),
-                    product.get("base_price"),
-                    product.get("shipping_cost", 0.0),
-                    product.get("tax", 0.0),
-                    product.get("total_price"),
-                    product.get("image_url"),
-                    product.get("direct_image_url"),
-                    product.get("product_url"),
-                    product.get("availability", "in_stock"),
-                    product.get("brand"),
-                    product.get("rating"),
-                    product.get("review_count"),
-                ),
-            )
-            await db.commit()
+        db = await self._get_connection()
+        await db.execute(
+            """
+            INSERT OR REPLACE INTO products
+            (merchant, merchant_id, title, price, base_price, shipping_cost,
+             tax, total_price, image_url, direct_image_url, product_url,
+             availability, brand, rating, review_count, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+        """,
+            (
+                product.get("merchant"),
+                product.get("merchant_id"),
+                product.get("title"),
+                product.get("price"),
+                product.get("base_price"),
+                product.get("shipping_cost", 0.0),
+                product.get("tax", 0.0),
+                product.get("total_price"),
+                product.get("image_url"),
+                product.get("direct_image_url"),
+                product.get("product_url"),
+                product.get("availability", "in_stock"),
+                product.get("brand"),
+                product.get("rating"),
+                product.get("review_count"),
+            ),
+        )
+        await db.commit()
 
     async def cleanup_expired(self):
         """Clean up expired cache entries"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                DELETE FROM search_cache WHERE expires_at < datetime('now')
-            """)
-            await db.commit()
+        db = await self._get_connection()
+        await db.execute("""
+            DELETE FROM search_cache WHERE expires_at < datetime('now')
+        """)
+        await db.execute("""
+            DELETE FROM robots_cache WHERE expires_at < datetime('now')
+        """)
+        await db.commit()
 
 
 # Global database instance
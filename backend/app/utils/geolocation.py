@@ -2,12 +2,17 @@
 
 import logging
 
-import httpx
+import orjson
 
 from app.config import config
+from app.utils.http_client import http_client_pool
+from app.utils.result_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Most IP lookups kept in memory at once
+LOCATION_CACHE_SIZE = 10_000
+
 
 class GeolocationService:
     """Service for IP geolocation and tax calculation"""
@@ -67,9 +72,22 @@ class GeolocationService:
         "DC": 0.06,
     }
 
+    # Simple shipping estimates: (free shipping over this price, flat fee otherwise)
+    SHIPPING_RULES = {
+        "amazon": (25.0, 5.99),  # Prime free shipping over $25
+        "walmart": (35.0, 5.99),
+        "target": (35.0, 5.99),
+        "bestbuy": (35.0, 5.99),
+        "newegg": (50.0, 7.99),
+        "ebay": (float("inf"), 5.99),  # Varies by seller
+    }
+    DEFAULT_SHIPPING_RULE = (float("inf"), 5.99)
+
     def __init__(self):
         self.provider = config.get_geolocation_provider()
         self.api_key = config.get_geolocation_api_key()
+        self.cache_ttl_minutes = config.get_geolocation_cache_ttl()
+        self._cache = TTLCache(self.cache_ttl_minutes * 60, LOCATION_CACHE_SIZE)
 
     async def get_location_from_ip(self, ip: str | None = None) -> dict[str, str] | None:
         """Get location information from IP address"""
@@ -78,6 +96,18 @@ class GeolocationService:
             # For now, return None and use default
             return None
 
+        cached = self._cache.get(ip)
+        if cached is not None:
+            return cached
+
+        location = await self._fetch_location(ip)
+        if location:
+            # Only cache successful lookups so transient failures are retried
+            self._cache.set(ip, location)
+        return location
+
+    async def _fetch_location(self, ip: str) -> dict[str, str] | None:
+        """Look up location for an IP address from the provider"""
         try:
             if self.provider == "ip-api.com":
                 url = f"http://ip-api.com/json/{ip}"
@@ -87,18 +117,18 @@ class GeolocationService:
                 # Default to ip-api.com free tier
                 url = f"http://ip-api.com/json/{ip}"
 
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(url)
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get("status") == "success" or "country" in data:
-                        return {
-                            "country": data.get("country", "US"),
-                            "region": data.get("region", data.get("regionName", "")),
-                            "state": data.get("regionCode", ""),
-                            "city": data.get("city", ""),
-                            "zip": data.get("zip", ""),
-                        }
+            client = http_client_pool.get_client()
+            response = await client.get(url, timeout=5.0)
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                if data.get("status") == "success" or "country" in data:
+                    return {
+                        "country": data.get("country", "US"),
+                        "region": data.get("region", data.get("regionName", "")),
+                        "state": data.get("regionCode", ""),
+                        "city": data.get("city", ""),
+                        "zip": data.get("zip", ""),
+                    }
         except Exception as e:
             logger.warning(f"Error getting location from IP {ip}: {e}")
 
@@ -117,18 +147,8 @@ class GeolocationService:
         if not config.is_shipping_enabled():
             return 0.0
 
-        # Simple shipping estimates based on merchant and price
-        shipping_estimates = {
-            "amazon": lambda p: 0.0 if p > 25 else 5.99,  # Prime free shipping over $25
-            "walmart": lambda p: 0.0 if p > 35 else 5.99,
-            "target": lambda p: 0.0 if p > 35 else 5.99,
-            "bestbuy": lambda p: 0.0 if p > 35 else 5.99,
-            "newegg": lambda p: 0.0 if p > 50 else 7.99,
-            "ebay": lambda p: 5.99,  # Varies by seller
-        }
-
-        estimate_func = shipping_estimates.get(merchant.lower(), lambda p: 5.99)
-        return estimate_func(base_price)
+        free_over, fee = self.SHIPPING_RULES.get(merchant.lower(), self.DEFAULT_SHIPPING_RULE)
+        return 0.0 if base_price > free_over else fee
 
 
 geolocation_service = GeolocationService()
@@ -0,0 +1,71 @@
+"""Shared HTTP client with connection pooling"""
+
+import asyncio
+import logging
+from collections.abc import Iterable
+from importlib.util import find_spec
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the "h2" package, installed with httpx[http2]; environments
+# without it (e.g. a bare httpx install) fall back to HTTP/1.1
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+# Seconds a warm-up request may take before it is abandoned
+WARM_UP_TIMEOUT = 5.0
+
+
+class HTTPClientPool:
+    """Lazily created HTTP client shared across the application"""
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_connections: int = 500,
+        max_keepalive_connections: int = 100,
+        keepalive_expiry: float = 60.0,
+        http2: bool = HTTP2_AVAILABLE,
+    ):
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self._client: httpx.AsyncClient | None = None
+
+    def get_client(self) -> httpx.AsyncClient:
+        """Get the shared client, creating it on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=False,
+                limits=self.limits,
+                http2=self.http2,
+            )
+        return self._client
+
+    async def warm_up(self, urls: Iterable[str], headers: dict[str, str] | None = None):
+        """Open pooled connections to the given URLs before the first search needs them"""
+        client = self.get_client()
+        urls = list(urls)
+        results = await asyncio.gather(
+            *(client.head(url, headers=headers, timeout=WARM_UP_TIMEOUT) for url in urls),
+            return_exceptions=True,
+        )
+        for url, result in zip(urls, results, strict=True):
+            if isinstance(result, Exception):
+                logger.debug("Connection warm-up failed for %s: %s", url, result)
+
+    async def close(self):
+        """Close the shared client and release pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Global HTTP client pool
+http_client_pool = HTTPClientPool()
@@ -2,19 +2,54 @@
 
 import asyncio
 import time
+from collections import deque
+from contextlib import suppress
 from urllib.parse import urlparse
 from urllib.robotparser import RobotFileParser
 
-import httpx
+from app.config import config
+from app.utils.database import db
+from app.utils.http_client import http_client_pool
+from app.utils.result_cache import TTLCache
+
+# How long a fetched robots.txt is trusted before it is fetched again
+ROBOTS_TXT_TTL_HOURS = 24
+
+# Most robots.txt parsers and verdicts remembered at once
+ROBOTS_PARSER_CACHE_SIZE = 1_000
+ROBOTS_VERDICT_CACHE_SIZE = 10_000
+
+# Adaptive per-domain delay bounds: each successful request shortens the
+# delay by DELAY_STEP, each throttled one doubles it
+MIN_DELAY = 0.25
+MAX_DELAY = 30.0
+DELAY_STEP = 0.05
+
+# Length of the sliding window that max_per_minute counts requests over
+REQUEST_WINDOW_SECONDS = 60
+
+# Status codes merchants use to tell us to slow down
+THROTTLE_STATUS_CODES = frozenset({429, 503})
 
 
 class RateLimiter:
     """Rate limiter with robots.txt support"""
 
-    def __init__(self, default_delay: float = 1.0):
+    def __init__(self, default_delay: float = 1.0, max_per_minute: int = 0):
         self.default_delay = default_delay
+        self.max_per_minute = max_per_minute
+        # Per domain, the time the most recently reserved request may be sent
         self.last_request_time: dict[str, float] = {}
-        self.robots_parsers: dict[str, RobotFileParser] = {}
+        self._domain_locks: dict[str, asyncio.Lock] = {}
+        # Per-domain request counts in one-second buckets: deque of [epoch_second, count]
+        self.request_buckets: dict[str, deque[list[int]]] = {}
+        self.domain_delay: dict[str, float] = {}
+        # Parsed rules per domain, trusted for as long as a fetched robots.txt
+        self.robots_parsers = TTLCache(ROBOTS_TXT_TTL_HOURS * 3600, ROBOTS_PARSER_CACHE_SIZE)
+        # Domains whose robots.txt rules include a query string
+        self._query_rule_domains: set[str] = set()
+        # Verdicts keyed on host and path, plus the query for _query_rule_domains
+        self._robots_verdicts = TTLCache(ROBOTS_TXT_TTL_HOURS * 3600, ROBOTS_VERDICT_CACHE_SIZE)
         self.user_agent = "CloseShave-Bot/1.0"
 
     async def check_robots_txt(self, base_url: str) -> bool:
@@ -22,43 +57,120 @@ class RateLimiter:
         parsed = urlparse(base_url)
         domain = f"{parsed.scheme}://{parsed.netloc}"
 
-        if domain not in self.robots_parsers:
-            robots_url = f"{domain}/robots.txt"
-            rp = RobotFileParser()
-            try:
-                async with httpx.AsyncClient(timeout=5.0) as client:
-                    response = await client.get(robots_url)
-                    if response.status_code == 200:
-                        rp.set_url(robots_url)
-                        rp.read()
-                    else:
-                        # If robots.txt doesn't exist, create empty parser
-                        # This allows all access but still caches the parser
-                        pass
-            except Exception:
-                # If we can't fetch robots.txt, create empty parser
-                # This allows all access but still caches the parser
-                pass
-
-            # Always cache the parser to avoid re-fetching
-            self.robots_parsers[domain] = rp
-
-        rp = self.robots_parsers[domain]
-        return rp.can_fetch(self.user_agent, base_url)
+        rp = self.robots_parsers.get(domain)
+        if rp is None:
+            rp, definitive = await self._load_robots_parser(domain)
+            if not definitive:
+                # Transient failure: allow this request, but neither the parser
+                # nor its verdict is kept so the next check fetches again
+                return rp.can_fetch(self.user_agent, base_url)
+            # Verdicts from rules this parser replaces may no longer hold
+            self._robots_verdicts.discard_prefix(parsed.netloc + "/")
+            self._query_rule_domains.discard(domain)
+            self.robots_parsers.set(domain, rp)
+            if self._rules_match_query(rp):
+                self._query_rule_domains.add(domain)
+
+        verdict_key = parsed.netloc + (parsed.path or "/")
+        if domain in self._query_rule_domains:
+            verdict_key += "?" + parsed.query
+        allowed = self._robots_verdicts.get(verdict_key)
+        if allowed is None:
+            allowed = rp.can_fetch(self.user_agent, base_url)
+            self._robots_verdicts.set(verdict_key, allowed)
+        return allowed
+
+    @staticmethod
+    def _rules_match_query(rp: RobotFileParser) -> bool:
+        """Whether any robots.txt rule includes a query string"""
+        entries = [*rp.entries, rp.default_entry] if rp.default_entry else rp.entries
+        # RobotFileParser stores rule paths percent-quoted, so "?" reads as "%3F"
+        return any("%3F" in line.path for entry in entries for line in entry.rulelines)
+
+    async def _load_robots_parser(self, domain: str) -> tuple[RobotFileParser, bool]:
+        """Build a domain's robots.txt parser and say whether it may be cached
+
+        Mirrors RobotFileParser.read(): 401/403 disallow everything, any other
+        4xx allows everything. Server errors and network failures allow the
+        request but aren't definitive answers.
+        """
+        rp = RobotFileParser()
+        try:
+            # Rules fetched by an earlier search or before a restart
+            body = await db.get_cached_robots_txt(domain)
+            if body is not None:
+                rp.parse(body.splitlines())
+                return rp, True
+
+            client = http_client_pool.get_client()
+            response = await client.get(f"{domain}/robots.txt", timeout=5.0)
+        except Exception:
+            rp.allow_all = True
+            return rp, False
+
+        if response.status_code == 200:
+            # Parse the body already downloaded; RobotFileParser.read()
+            # would fetch it again with blocking urllib
+            rp.parse(response.text.splitlines())
+            # Failing to persist the rules only costs a re-fetch after restart
+            with suppress(Exception):
+                await db.cache_robots_txt(domain, response.text, ROBOTS_TXT_TTL_HOURS)
+            return rp, True
+        if response.status_code in (401, 403):
+            rp.disallow_all = True
+            return rp, True
+        rp.allow_all = True
+        return rp, 400 <= response.status_code < 500
 
     async def wait_if_needed(self, domain: str, delay: float | None = None):
         """Wait if needed to respect rate limits"""
-        delay = delay or self.default_delay
-        now = time.time()
+        delay = delay or self.domain_delay.get(domain, self.default_delay)
+
+        # Reserve the next slot before sleeping, so concurrent callers queue up
+        # one delay apart instead of all waking at once
+        lock = self._domain_locks.setdefault(domain, asyncio.Lock())
+        async with lock:
+            if self.max_per_minute > 0:
+                await self._wait_for_window(domain)
+            now = time.time()
+            last = self.last_request_time.get(domain)
+            send_at = now if last is None else max(now, last + delay)
+            self.last_request_time[domain] = send_at
 
-        if domain in self.last_request_time:
-            time_since_last = now - self.last_request_time[domain]
-            if time_since_last < delay:
-                wait_time = delay - time_since_last
-                await asyncio.sleep(wait_time)
+        if send_at > now:
+            await asyncio.sleep(send_at - now)
 
-        self.last_request_time[domain] = time.time()
+    async def _wait_for_window(self, domain: str):
+        """Wait until the domain has had fewer than max_per_minute requests in the window"""
+        buckets = self.request_buckets.setdefault(domain, deque())
+        while True:
+            now = time.time()
+            # Drop buckets that have slid out of the window
+            while buckets and buckets[0][0] <= now - REQUEST_WINDOW_SECONDS:
+                buckets.popleft()
+            if sum(count for _, count in buckets) < self.max_per_minute:
+                break
+            await asyncio.sleep(buckets[0][0] + REQUEST_WINDOW_SECONDS - now)
+
+        second = int(now)
+        if buckets and buckets[-1][0] == second:
+            buckets[-1][1] += 1
+        else:
+            buckets.append([second, 1])
+
+    def report_response(self, domain: str, status_code: int):
+        """Adapt a domain's delay to whether it throttled the last request"""
+        delay = self.domain_delay.get(domain, self.default_delay)
+        if status_code in THROTTLE_STATUS_CODES:
+            self.domain_delay[domain] = min(MAX_DELAY, delay * 2)
+        else:
+            self.domain_delay[domain] = max(MIN_DELAY, delay - DELAY_STEP)
 
     def set_user_agent(self, user_agent: str):
         """Set user agent for robots.txt checks"""
         self.user_agent = user_agent
+        self._robots_verdicts.clear()
+
+
+# Shared by every scraper so per-domain timing and robots.txt rules outlive a single search
+rate_limiter = RateLimiter(config.get_request_delay(), config.get_max_requests_per_minute())
@@ -0,0 +1,63 @@
+"""In-memory LRU caches with expiry"""
+
+import time
+from typing import Any
+
+from app.config import config
+from app.models import Product
+
+
+class TTLCache:
+    """Per-process LRU cache whose entries expire after a fixed number of seconds"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # In-memory cache: {cache_key: (value, timestamp)}, least recently used first
+        self._cache: dict[str, tuple[Any, float]] = {}
+
+    def get(self, cache_key: str) -> Any | None:
+        """Get a cached value if present and not expired"""
+        cached = self._cache.pop(cache_key, None)
+        if cached is None:
+            return None
+        if time.time() - cached[1] >= self.ttl_seconds:
+            return None
+        # Re-insert to mark as most recently used
+        self._cache[cache_key] = cached
+        return cached[0]
+
+    def set(self, cache_key: str, value: Any):
+        """Cache a value, evicting the least recently used entry when full"""
+        self._cache.pop(cache_key, None)
+        if len(self._cache) >= self.max_entries:
+            del self._cache[next(iter(self._cache))]
+        self._cache[cache_key] = (value, time.time())
+
+    def discard_prefix(self, prefix: str):
+        """Drop every entry whose key starts with prefix"""
+        for cache_key in [key for key in self._cache if key.startswith(prefix)]:
+            del self._cache[cache_key]
+
+    def clear(self):
+        """Drop every cached entry"""
+        self._cache.clear()
+
+
+class SearchResultCache(TTLCache):
+    """Per-process LRU cache of merchant search results, checked before SQLite"""
+
+    def __init__(self):
+        super().__init__(config.get_memory_cache_ttl(), config.get_memory_cache_size())
+
+    def get(self, cache_key: str) -> list[Product] | None:
+        """Get cached products if present and not expired"""
+        return super().get(cache_key)
+
+    def set(self, cache_key: str, products: list[Product]):
+        """Cache products, evicting the least recently used entry when full"""
+        super().set(cache_key, products)
+
+
+# Global search result cache
+search_result_cache = SearchResultCache()
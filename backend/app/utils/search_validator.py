@@ -2,15 +2,23 @@
 
 import asyncio
 import logging
-import time
 from typing import Any
 
-import httpx
+import orjson
 
 from app.config import config
+from app.utils.http_client import http_client_pool
+from app.utils.rate_limiter import RateLimiter
+from app.utils.result_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Most validation results kept in memory at once
+VALIDATION_CACHE_SIZE = 10_000
+
+# Most autocomplete suggestions kept per query
+MAX_SUGGESTIONS = 10
+
 
 class SearchValidator:
     """Validates search terms using DuckDuckGo API"""
@@ -21,8 +29,8 @@ class SearchValidator:
         self.base_url = "https://api.duckduckgo.com"
         self.autocomplete_url = "https://duckduckgo.com/ac"
         self.rate_limiter_delay = 0.5  # Be respectful to DuckDuckGo
-        # In-memory cache: {cache_key: (result_dict, timestamp)}
-        self._cache: dict[str, tuple[dict[str, Any], float]] = {}
+        self.rate_limiter = RateLimiter(self.rate_limiter_delay)
+        self._cache = TTLCache(self.cache_ttl_minutes * 60, VALIDATION_CACHE_SIZE)
 
     async def validate_query(self, query: str) -> dict[str, Any]:
         """
@@ -40,18 +48,21 @@ class SearchValidator:
 
         query = query.strip()
 
-        # Check cache first
-        cache_key = f"validation:{query}"
-        cached = await self._get_cached_validation(cache_key)
+        # Check cache first; case variants of a query share one entry
+        cache_key = query.casefold()
+        cached = self._cache.get(cache_key)
         if cached:
             return cached
 
         try:
-            # Get suggestions first (faster)
-            suggestions = await self._get_suggestions(query)
+            # Space out calls to DuckDuckGo before sending, so the delay gates
+            # the next validation instead of holding back this response
+            await self.rate_limiter.wait_if_needed(self.autocomplete_url)
 
-            # Check if query has results by trying instant answer API
-            has_results = await self._check_has_results(query)
+            # The autocomplete and instant answer lookups are independent
+            suggestions, has_results = await asyncio.gather(
+                self._get_suggestions(query), self._check_has_results(query)
+            )
 
             # Determine validation status
             is_valid = has_results or len(suggestions) > 0
@@ -73,10 +84,7 @@ class SearchValidator:
             }
 
             # Cache the result
-            await self._cache_validation(cache_key, result)
-
-            # Rate limiting
-            await asyncio.sleep(self.rate_limiter_delay)
+            self._cache.set(cache_key, result)
 
             return result
 
@@ -93,102 +101,67 @@ class SearchValidator:
     async def _get_suggestions(self, query: str) -> list[str]:
         """Get search suggestions from DuckDuckGo autocomplete"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    self.autocomplete_url,
-                    params={"q": query, "kl": "us-en"},
-                    headers={
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                    },
-                )
-                response.raise_for_status()
-
-                data = response.json()
-                suggestions = []
-
-                # DuckDuckGo autocomplete returns list of dicts with 'phrase' key
-                for item in data:
-                    if isinstance(item, dict) and "phrase" in item:
-                        phrase = item["phrase"].strip()
-                        if phrase and phrase.lower() != query.lower():
-                            suggestions.append(phrase)
-                    elif isinstance(item, str):
-                        if item.strip() and item.strip().lower() != query.lower():
-                            suggestions.append(item.strip())
-
-                return suggestions[:10]  # Limit suggestions
+            client = http_client_pool.get_client()
+            response = await client.get(
+                self.autocomplete_url,
+                params={"q": query, "kl": "us-en"},
+                headers={
+                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+                },
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+
+            data = orjson.loads(response.content)
+            query_folded = query.casefold()
+            # Ordered and deduplicated; a dict keeps DuckDuckGo's ranking
+            suggestions: dict[str, None] = {}
+
+            for item in data:
+                phrase = self._extract_phrase(item)
+                if phrase and phrase.casefold() != query_folded:
+                    suggestions[phrase] = None
+                    if len(suggestions) == MAX_SUGGESTIONS:
+                        break
+
+            return list(suggestions)
 
         except Exception as e:
             logger.warning(f"Error getting suggestions for '{query}': {e}")
             return []
 
+    @staticmethod
+    def _extract_phrase(item: Any) -> str | None:
+        """Get the stripped phrase from an autocomplete item"""
+        # DuckDuckGo autocomplete returns list of dicts with 'phrase' key
+        if isinstance(item, dict):
+            item = item.get("phrase")
+        return item.strip() if isinstance(item, str) else None
+
     async def _check_has_results(self, query: str) -> bool:
         """Check if query has results using DuckDuckGo instant answer API"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/",
-                    params={"q": query, "format": "json", "no_html": "1", "skip_disambig": "1"},
-                    headers={
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                    },
-                )
-                response.raise_for_status()
-
-                data = response.json()
-
-                # Check if we got meaningful results
-                # DuckDuckGo returns AbstractText, Answer, or RelatedTopics
-                has_abstract = bool(data.get("AbstractText"))
-                has_answer = bool(data.get("Answer"))
-                has_related = (
-                    bool(data.get("RelatedTopics")) and len(data.get("RelatedTopics", [])) > 0
-                )
-
-                return has_abstract or has_answer or has_related
+            client = http_client_pool.get_client()
+            response = await client.get(
+                f"{self.base_url}/",
+                params={"q": query, "format": "json", "no_html": "1", "skip_disambig": "1"},
+                headers={
+                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+                },
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+
+            data = orjson.loads(response.content)
+
+            # Check if we got meaningful results
+            # DuckDuckGo returns AbstractText, Answer, or RelatedTopics; stop at the first
+            return bool(data.get("AbstractText") or data.get("Answer") or data.get("RelatedTopics"))
 
         except Exception as e:
             logger.warning(f"Error checking results for '{query}': {e}")
             return False
 
-    async def _get_cached_validation(self, cache_key: str) -> dict[str, Any] | None:
-        """Get cached validation result if it exists and is still valid"""
-        if cache_key not in self._cache:
-            return None
-
-        result, timestamp = self._cache[cache_key]
-        current_time = time.time()
-        age_minutes = (current_time - timestamp) / 60.0
-
-        # Check if cache entry is still valid (within TTL)
-        if age_minutes < self.cache_ttl_minutes:
-            return result
-
-        # Cache entry expired, remove it
-        del self._cache[cache_key]
-        return None
-
-    async def _cache_validation(self, cache_key: str, result: dict[str, Any]):
-        """Cache validation result with current timestamp"""
-        current_time = time.time()
-        self._cache[cache_key] = (result, current_time)
-
-        # Optional: Clean up expired entries periodically to prevent memory bloat
-        # This is a simple cleanup that runs occasionally
-        if len(self._cache) > 1000:  # Only clean when cache gets large
-            await self._cleanup_expired_cache()
-
-    async def _cleanup_expired_cache(self):
-        """Remove expired cache entries to free memory"""
-        current_time = time.time()
-        expired_keys = [
-            key
-            for key, (_, timestamp) in self._cache.items()
-            if (current_time - timestamp) / 60.0 >= self.cache_ttl_minutes
-        ]
-        for key in expired_keys:
-            del self._cache[key]
-
 
 # Global validator instance
 search_validator = SearchValidator()
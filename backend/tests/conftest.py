@@ -3,11 +3,14 @@
 import asyncio
 from collections.abc import AsyncGenerator
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
 from app.utils.database import db
+from app.utils.http_client import http_client_pool
+from app.utils.result_cache import search_result_cache
 
 
 @pytest.fixture(scope="session")
@@ -23,11 +26,29 @@ async def test_db() -> AsyncGenerator:
     """Set up test database - automatically runs before each test"""
     # Initialize test database
     await db.init_db()
+    search_result_cache.clear()
     yield db
-    # Cleanup could go here if needed
+    # Close the shared connection while this test's event loop is still running
+    await db.close()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
-    """Create test client"""
+    """Create test client shared by the whole session"""
     return TestClient(app)
+
+
+@pytest.fixture
+async def mock_http(monkeypatch) -> AsyncGenerator:
+    """Serve the shared HTTP client from a handler: call mock_http(handler) in a test"""
+    clients: list[httpx.AsyncClient] = []
+
+    def install(handler) -> httpx.AsyncClient:
+        mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        clients.append(mock_client)
+        monkeypatch.setattr(http_client_pool, "get_client", lambda: mock_client)
+        return mock_client
+
+    yield install
+    for mock_client in clients:
+        await mock_client.aclose()
@@ -4,10 +4,8 @@ from fastapi.testclient import TestClient
 
 from app.main import app
 
-client = TestClient(app)
 
-
-def test_root_endpoint():
+def test_root_endpoint(client):
     """Test root endpoint"""
     response = client.get("/")
     assert response.status_code == 200
@@ -18,7 +16,7 @@ def test_root_endpoint():
     assert data["status"] == "running"
 
 
-def test_health_check():
+def test_health_check(client):
     """Test health check endpoint"""
     response = client.get("/api/health")
     assert response.status_code == 200
@@ -29,7 +27,7 @@ def test_health_check():
     assert isinstance(data["merchants"], list)
 
 
-def test_get_merchants():
+def test_get_merchants(client):
     """Test get merchants endpoint"""
     response = client.get("/api/merchants")
     assert response.status_code == 200
@@ -43,14 +41,14 @@ def test_get_merchants():
         assert "version" in merchant
 
 
-def test_validate_search_empty_query():
+def test_validate_search_empty_query(client):
     """Test validation with empty query"""
     response = client.post("/api/validate", json={"query": ""})
     # Should return 422 validation error or 400
     assert response.status_code in [400, 422]
 
 
-def test_validate_search_valid_query():
+def test_validate_search_valid_query(client):
     """Test validation with valid query"""
     response = client.post("/api/validate", json={"query": "laptop"})
     # Should return 200 or handle gracefully
@@ -61,14 +59,14 @@ def test_validate_search_valid_query():
         assert "suggestions" in data
 
 
-def test_search_products_empty_query():
+def test_search_products_empty_query(client):
     """Test search with empty query"""
     response = client.post("/api/search", json={"query": ""})
     # Should return validation error
     assert response.status_code in [400, 422]
 
 
-def test_search_products_valid_query():
+def test_search_products_valid_query(client):
     """Test search with valid query"""
     response = client.post("/api/search", json={"query": "test product", "max_results": 5})
     # Should return 200 (even if no results)
@@ -80,19 +78,230 @@ def test_search_products_valid_query():
     assert isinstance(data["products"], list)
 
 
-def test_image_proxy_no_url():
+def test_image_proxy_no_url(client):
     """Test image proxy without URL"""
     response = client.get("/api/image-proxy")
     assert response.status_code == 422  # Validation error
 
 
-def test_image_proxy_invalid_url():
+def test_image_proxy_invalid_url(client):
     """Test image proxy with invalid URL"""
     response = client.get("/api/image-proxy?url=invalid")
     assert response.status_code in [400, 422, 502]
 
 
-def test_image_proxy_private_ip():
+def test_image_proxy_private_ip(client):
     """Test image proxy with private IP"""
     response = client.get("/api/image-proxy?url=http://127.0.0.1/image.jpg")
     assert response.status_code in [403, 502]
+
+
+def test_image_proxy_streams_image(client, mock_http):
+    """Test image proxy streams the upstream image body"""
+    import httpx
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"content-type": "image/jpeg"}, content=b"jpegdata")
+
+    mock_http(handler)
+
+    response = client.get("/api/image-proxy?url=https://images.amazon.com/image.jpg")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    assert response.content == b"jpegdata"
+
+
+def test_is_allowed_image_host():
+    """Test image host allow-list matching"""
+    from app.api.routes import is_allowed_image_host
+
+    assert is_allowed_image_host("amazon.com")
+    assert is_allowed_image_host("Images.Amazon.com")
+    assert not is_allowed_image_host("evilamazon.com")
+    assert not is_allowed_image_host("amazon.com.evil.net")
+
+
+def test_is_non_public_ip():
+    """Test private and reserved IP detection"""
+    from app.api.routes import is_non_public_ip
+
+    assert is_non_public_ip("10.0.0.1")
+    assert is_non_public_ip("172.16.5.4")
+    assert is_non_public_ip("192.168.1.1")
+    assert is_non_public_ip("169.254.169.254")
+    assert is_non_public_ip("fd00::1")
+    assert is_non_public_ip("::1")
+    assert is_non_public_ip("100.64.0.1")
+    assert not is_non_public_ip("172.32.0.1")
+    assert not is_non_public_ip("8.8.8.8")
+    assert not is_non_public_ip("images.amazon.com")
+
+
+def test_image_proxy_rejects_oversized_image(client, mock_http):
+    """Test image proxy rejects images larger than the size limit"""
+    import httpx
+
+    from app.api.routes import MAX_IMAGE_BYTES
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "image/jpeg", "content-length": str(MAX_IMAGE_BYTES + 1)},
+            stream=httpx.ByteStream(b""),
+        )
+
+    mock_http(handler)
+
+    response = client.get("/api/image-proxy?url=https://images.amazon.com/image.jpg")
+    assert response.status_code == 413
+
+
+async def test_image_stream_aborts_past_size_limit():
+    """Test image streaming raises instead of truncating a body without Content-Length"""
+    import httpx
+    import pytest
+
+    from app.api.routes import MAX_IMAGE_BYTES, iter_image_bytes
+    from app.exceptions import ImageProxyError
+
+    response = httpx.Response(
+        200,
+        content=b"x" * (MAX_IMAGE_BYTES + 1),
+        request=httpx.Request("GET", "https://images.amazon.com/image.jpg"),
+    )
+
+    with pytest.raises(ImageProxyError):
+        async for _chunk in iter_image_bytes(response):
+            pass
+
+
+async def test_search_products_served_from_cache(client):
+    """Test search returns cached products without scraping"""
+    from app.api.routes import get_cache_key
+    from app.utils.database import db
+
+    cache_key = get_cache_key(
+        "cached gadget", "ebay", {"max_results": 5, "min_price": None, "max_price": None}
+    )
+    await db.cache_search(
+        cache_key,
+        "cached gadget",
+        "ebay",
+        [
+            {
+                "title": "Cached Gadget",
+                "price": 10.0,
+                "base_price": 10.0,
+                "total_price": 10.0,
+                "image_url": "",
+                "direct_image_url": "",
+                "product_url": "https://www.ebay.com/itm/1",
+                "merchant": "ebay",
+            }
+        ],
+    )
+
+    response = client.post(
+        "/api/search", json={"query": "cached gadget", "merchants": ["ebay"], "max_results": 5}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["cached"] is True
+    assert [p["title"] for p in data["products"]] == ["Cached Gadget"]
+
+
+async def test_stream_search_products_from_cache(client):
+    """Test streaming search emits one NDJSON line per product"""
+    import json
+
+    from app.api.routes import get_cache_key
+    from app.utils.database import db
+
+    cache_key = get_cache_key(
+        "streamed gadget", "ebay", {"max_results": 5, "min_price": None, "max_price": None}
+    )
+    await db.cache_search(
+        cache_key,
+        "streamed gadget",
+        "ebay",
+        [
+            {
+                "title": f"Streamed Gadget {price}",
+                "price": price,
+                "base_price": price,
+                "total_price": price,
+                "image_url": "",
+                "direct_image_url": "",
+                "product_url": "https://www.ebay.com/itm/1",
+                "merchant": "ebay",
+            }
+            for price in (20.0, 10.0)
+        ],
+    )
+
+    response = client.post(
+        "/api/search/stream",
+        json={"query": "streamed gadget", "merchants": ["ebay"], "max_results": 5},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [p["title"] for p in lines] == ["Streamed Gadget 10.0", "Streamed Gadget 20.0"]
+
+
+def test_cors_preflight(client):
+    """Test CORS preflight for the frontend origin is answered and cacheable"""
+    response = client.options(
+        "/api/search",
+        headers={
+            "Origin": "http://localhost:5173",
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "content-type",
+        },
+    )
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == "http://localhost:5173"
+    assert response.headers["access-control-max-age"] == "86400"
+
+    response = client.options(
+        "/api/search",
+        headers={"Origin": "http://evil.example", "Access-Control-Request-Method": "POST"},
+    )
+    assert response.status_code == 400
+
+
+def test_lifespan_opens_and_closes_shared_client(monkeypatch):
+    """Test app lifespan creates the shared HTTP client and closes it on shutdown"""
+    from app.utils.http_client import http_client_pool
+
+    # Never contact real merchants from the test suite
+    monkeypatch.setattr("app.main.get_warm_up_urls", list)
+
+    with TestClient(app) as lifespan_client:
+        assert lifespan_client.get("/").status_code == 200
+        assert http_client_pool._client is not None
+    assert http_client_pool._client is None
+
+
+async def test_warm_up_respects_robots_txt(mock_http):
+    """Test connection warm-up skips merchants whose robots.txt disallows it"""
+    import httpx
+
+    from app.main import warm_up_connections
+    from app.utils.database import db
+
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append((request.method, str(request.url), request.headers["user-agent"]))
+        return httpx.Response(200)
+
+    await db.cache_robots_txt("https://closed.example", "User-agent: *\nDisallow: /\n")
+    await db.cache_robots_txt("https://open.example", "User-agent: *\nDisallow: /private\n")
+
+    mock_http(handler)
+
+    await warm_up_connections(["https://closed.example/", "https://open.example/"])
+
+    assert [(method, url) for method, url, _ in requested] == [("HEAD", "https://open.example/")]
+    assert requested[0][2].startswith("Mozilla/5.0")
@@ -1,12 +1,12 @@
 import pytest
-from bs4 import BeautifulSoup
+from lxml.html import HtmlElement, fragment_fromstring
 
 from app.models import Product
 from app.scrapers.base import BaseScraper
 
 
 class MockScraper(BaseScraper):
-    def _parse_results(self, soup: BeautifulSoup, max_results: int) -> list[Product]:
+    def _parse_results(self, tree: HtmlElement, max_results: int) -> list[Product]:
         return []
 
 
@@ -31,21 +31,300 @@ def test_resolve_url_relative_path(scraper):
 
 
 def test_extract_url(scraper):
-    soup = BeautifulSoup('<a href="/product">Link</a>', "lxml")
-    element = soup.find("a")
+    element = fragment_fromstring('<a href="/product">Link</a>')
     base_url = "https://example.com"
     assert scraper._extract_url(element, base_url) == "https://example.com/product"
 
 
 def test_extract_image_url(scraper):
-    soup = BeautifulSoup('<img src="/image.jpg" />', "lxml")
-    element = soup.find("img")
+    element = fragment_fromstring('<img src="/image.jpg" />')
     base_url = "https://example.com"
     assert scraper._extract_image_url(element, base_url) == "https://example.com/image.jpg"
 
 
 def test_extract_image_url_data_src(scraper):
-    soup = BeautifulSoup('<img data-src="/image.jpg" />', "lxml")
-    element = soup.find("img")
+    element = fragment_fromstring('<img data-src="/image.jpg" />')
     base_url = "https://example.com"
     assert scraper._extract_image_url(element, base_url) == "https://example.com/image.jpg"
+
+
+def test_ebay_parse_results():
+    from lxml import html
+
+    from app.scrapers.ebay import EbayScraper
+
+    tree = html.fromstring(
+        """
+        <ul>
+          <li class="s-item s-item__header"><div class="s-item__title">Shop on eBay</div></li>
+          <li class="s-item">
+            <a class="s-item__link" href="https://www.ebay.com/itm/1">
+              <div class="s-item__title"><span>Gaming</span> <span>Laptop</span></div>
+            </a>
+            <span class="s-item__price">$1,234.56</span>
+            <div class="s-item__image"><img src="/img/1.jpg"></div>
+            <span class="s-item__availability">Only 2 left</span>
+          </li>
+        </ul>
+        """
+    )
+
+    products = EbayScraper()._parse_results(tree, 10)
+
+    assert len(products) == 1
+    product = products[0]
+    assert product.title == "Gaming Laptop"
+    assert product.base_price == 1234.56
+    assert product.product_url == "https://www.ebay.com/itm/1"
+    assert product.image_url == "https://www.ebay.com/img/1.jpg"
+    assert product.availability == "limited"
+
+
+def test_selectors_compiled_once_across_instances():
+    from app.scrapers.ebay import EbayScraper
+
+    first, second = EbayScraper(), EbayScraper()
+    assert first._xpaths["title"] is second._xpaths["title"]
+
+
+class FakeRoutedPage:
+    async def route(self, url, handler):
+        self.handler = handler
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def new_page(self):
+        return FakeRoutedPage()
+
+    async def close(self):
+        self.browser.contexts.remove(self)
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.closed = False
+
+    def is_connected(self):
+        return not self.closed
+
+    async def new_context(self):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+async def test_js_scrapers_share_browser(monkeypatch):
+    from app.utils.browser import BrowserPool
+
+    pool = BrowserPool()
+
+    async def launch():
+        return FakeBrowser()
+
+    monkeypatch.setattr(pool, "_launch", launch)
+    monkeypatch.setattr("app.scrapers.base.browser_pool", pool)
+
+    first, second = MockScraper("test_merchant"), MockScraper("test_merchant")
+    first.requires_js = second.requires_js = True
+    async with first, second:
+        browser = first.context.browser
+        assert first.page is not None
+        assert first.context is not second.context
+        assert second.context.browser is browser
+    assert browser.contexts == []
+    assert not browser.closed
+    assert first.page is None
+
+
+async def test_browser_pool_recycles_browser(monkeypatch):
+    from app.utils.browser import BrowserPool
+
+    pool = BrowserPool()
+    pool.recycle_after = 2
+
+    async def launch():
+        return FakeBrowser()
+
+    monkeypatch.setattr(pool, "_launch", launch)
+
+    first = await pool.acquire()
+    second = await pool.acquire()  # retires the browser
+    third = await pool.acquire()
+    old_browser = first.browser
+    assert second.browser is old_browser
+    assert third.browser is not old_browser
+
+    await pool.release(first)
+    assert not old_browser.closed
+    await pool.release(second)
+    assert old_browser.closed
+    await pool.release(third)
+    assert not third.browser.closed
+
+
+async def test_browser_pool_keeps_cdp_browser(monkeypatch):
+    from app.utils.browser import BrowserPool
+
+    monkeypatch.setenv("BROWSER_CDP_URL", "http://chromium:9222")
+    pool = BrowserPool()
+    pool.recycle_after = 1
+
+    async def launch():
+        return FakeBrowser()
+
+    monkeypatch.setattr(pool, "_launch", launch)
+
+    first = await pool.acquire()
+    second = await pool.acquire()
+    assert second.browser is first.browser
+
+
+async def test_playwright_search_falls_back_when_results_never_render(monkeypatch):
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    class FakePage:
+        async def goto(self, url, wait_until):
+            pass
+
+        async def wait_for_selector(self, selector, state, timeout):
+            raise PlaywrightTimeoutError("timed out")
+
+        async def content(self):
+            return "<html><body></body></html>"
+
+    monkeypatch.setattr("app.scrapers.parse_pool.parse_pool.max_workers", 0)
+    scraper = MockScraper("test_merchant")
+    scraper.selectors["product_container"] = ".result"
+    scraper.page = FakePage()
+    assert await scraper._search_with_playwright("https://example.com", 5) == []
+
+
+def test_determine_availability(scraper):
+    assert scraper._determine_availability(None) == "in_stock"
+    assert scraper._determine_availability(fragment_fromstring("<p>Sold Out</p>")) == "out_of_stock"
+    assert scraper._determine_availability(fragment_fromstring("<p>Only 2 left</p>")) == "limited"
+    assert scraper._determine_availability(fragment_fromstring("<p>In stock</p>")) == "in_stock"
+
+
+async def test_block_nonessential_resources():
+    from types import SimpleNamespace
+
+    from app.scrapers.base import block_nonessential_resources
+
+    class FakeRoute:
+        def __init__(self, resource_type):
+            self.request = SimpleNamespace(resource_type=resource_type)
+            self.outcome = None
+
+        async def abort(self):
+            self.outcome = "aborted"
+
+        async def continue_(self):
+            self.outcome = "continued"
+
+    image, script = FakeRoute("image"), FakeRoute("script")
+    await block_nonessential_resources(image)
+    await block_nonessential_resources(script)
+    assert image.outcome == "aborted"
+    assert script.outcome == "continued"
+
+
+async def test_search_with_requests_stops_streaming_early(monkeypatch, mock_http):
+    import httpx
+
+    from app.scrapers.ebay import EbayScraper
+
+    item = (
+        '<li class="s-item"><div class="s-item__title">Item {n}</div>'
+        '<span class="s-item__price">${n}.00</span>'
+        '<a class="s-item__link" href="https://www.ebay.com/itm/{n}">link</a></li>'
+    )
+    chunks = [b"<html><body><ul>"]
+    chunks += [item.format(n=n).encode() for n in range(1, 51)]
+    sent = []
+
+    async def body():
+        for chunk in chunks:
+            sent.append(chunk)
+            yield chunk
+
+    def handler(_request):
+        return httpx.Response(200, content=body())
+
+    mock_http(handler)
+    monkeypatch.setattr("app.scrapers.base.STREAM_CHUNK_SIZE", 256)
+
+    scraper = EbayScraper()
+    products = await scraper._search_with_requests("https://www.ebay.com/sch?q=x", 3)
+    assert [p.title for p in products] == ["Item 1", "Item 2", "Item 3"]
+    assert len(sent) < len(chunks)
+
+
+async def test_parse_pool_parses_in_worker_process():
+    from app.scrapers.ebay import EbayScraper
+    from app.scrapers.parse_pool import ParsePool
+
+    html = (
+        '<html><body><ul><li class="s-item"><div class="s-item__title">Widget</div>'
+        '<span class="s-item__price">$5.00</span>'
+        '<a class="s-item__link" href="https://www.ebay.com/itm/1">link</a></li></ul></body></html>'
+    )
+    pool = ParsePool()
+    pool.max_workers = 1
+    try:
+        products = await pool.parse(EbayScraper(), html, 5)
+    finally:
+        pool.close()
+    assert [(p.title, p.base_price) for p in products] == [("Widget", 5.0)]
+
+
+def test_get_search_url():
+    from app.scrapers.ebay import EbayScraper
+
+    assert EbayScraper().get_search_url("usb c cable") == (
+        "https://www.ebay.com/sch/i.html?_nkw=usb+c+cable"
+    )
+
+
+def test_amazon_parse_results_sets_asin():
+    from lxml import html
+
+    from app.scrapers.amazon import AmazonScraper
+
+    tree = html.fromstring(
+        "<html><body><div data-component-type='s-search-result' data-asin='B000123'>"
+        "<h2><a href='/dp/B000123'><span>Cable</span></a></h2>"
+        "<span class='a-price'><span class='a-offscreen'>$7.49</span></span></div></body></html>"
+    )
+    [product] = AmazonScraper()._parse_results(tree, 5)
+    assert product.merchant == "amazon"
+    assert product.merchant_id == "B000123"
+    assert product.product_url == "https://www.amazon.com/dp/B000123"
+    assert product.base_price == 7.49
+
+
+def test_parse_results_backfills_skipped_containers():
+    from lxml import html
+
+    from app.scrapers.ebay import EbayScraper
+
+    items = "".join(
+        f'<li class="s-item"><div class="s-item__title">Item {n}</div>'
+        f'<span class="s-item__price">${n}.00</span></li>'
+        for n in range(1, 4)
+    )
+    tree = html.fromstring(
+        '<html><body><ul><li class="s-item s-item__header">'
+        '<div class="s-item__title">Shop on eBay</div></li>'
+        f"{items}</ul></body></html>"
+    )
+
+    products = EbayScraper()._parse_results(tree, 2)
+    assert [p.title for p in products] == ["Item 1", "Item 2"]
@@ -26,6 +26,8 @@ def test_parse_price():
     assert PriceParser.parse_price("$10.99") == 10.99
     assert PriceParser.parse_price("10.99") == 10.99
     assert PriceParser.parse_price("$1,234.56") == 1234.56
+    assert PriceParser.parse_price("Now $1,299.00\n  Was $1,499.00") == 1299.0
+    assert PriceParser.parse_price("See price in cart") is None
 
 
 def test_get_cache_key():
@@ -40,3 +42,419 @@ def test_get_cache_key():
     assert key1 == key2
     # Different inputs should produce different keys
     assert key1 != key3
+    # 128-bit digest rendered as hex
+    assert len(key1) == 32
+
+
+def test_enrich_products_with_tax_shipping():
+    """Test batch tax and shipping enrichment"""
+    from app.api.routes import enrich_products_with_tax_shipping
+    from app.models import Product
+
+    product = Product(
+        title="Laptop",
+        price=100.0,
+        base_price=100.0,
+        total_price=100.0,
+        image_url="",
+        direct_image_url="",
+        product_url="https://www.ebay.com/itm/1",
+        merchant="ebay",
+    )
+
+    [enriched] = enrich_products_with_tax_shipping([product], {"state": "CA"})
+
+    assert enriched.shipping_cost == 5.99
+    assert enriched.tax == 7.25
+    assert enriched.total_price == 113.24
+    assert enriched.price == enriched.total_price
+
+
+async def test_cache_search_expires():
+    """Test cached searches are not served once their TTL has passed"""
+    from app.utils.database import db
+
+    await db.cache_search("ttl-key-live", "laptop", "amazon", [{"title": "A"}], ttl_hours=1)
+    await db.cache_search("ttl-key-expired", "laptop", "amazon", [{"title": "B"}], ttl_hours=0)
+
+    assert await db.get_cached_search("ttl-key-live") == [{"title": "A"}]
+    assert await db.get_cached_search("ttl-key-expired") is None
+
+
+def test_config_reload_reuses_file_contents():
+    """Test config reload only re-reads files that changed and never shares parsed dicts"""
+    from app.config import _read_bytes, config
+
+    config.reload()
+    misses = _read_bytes.cache_info().misses
+    config.settings["merchants"]["amazon"] = "mutated"
+    config.reload()
+
+    assert _read_bytes.cache_info().misses == misses
+    assert config.settings["merchants"]["amazon"] != "mutated"
+    assert config.get_merchant_enabled("amazon") == bool(config.settings["merchants"]["amazon"])
+
+
+def test_exception_to_json_bytes():
+    """Test pre-serialized exception bodies match to_dict()"""
+    import orjson
+
+    from app.exceptions import ScraperError, ValidationError
+
+    errors = [ValidationError("Query cannot be empty"), ScraperError("Timed out", merchant="ebay")]
+    for error in errors:
+        assert orjson.loads(error.to_json_bytes()) == error.to_dict()
+
+
+async def test_http_client_pool_reuses_client():
+    """Test the shared HTTP client is created once and recreated after close"""
+    from app.utils.http_client import HTTPClientPool
+
+    pool = HTTPClientPool(http2=False)
+    client = pool.get_client()
+    assert pool.get_client() is client
+    await pool.close()
+    assert client.is_closed
+    assert pool.get_client() is not client
+    await pool.close()
+
+
+def test_exception_details():
+    """Test exceptions share empty details and never mutate the caller's dict"""
+    from app.exceptions import RateLimitError, ScraperError, ValidationError
+
+    assert ValidationError("a").details is ValidationError("b").details
+    assert "details" not in ValidationError("a").to_dict()
+
+    details = {"url": "https://example.com"}
+    error = ScraperError("Timed out", merchant="ebay", details=details)
+    assert error.details == {"url": "https://example.com", "merchant": "ebay"}
+    assert details == {"url": "https://example.com"}
+    assert RateLimitError(retry_after=5).details == {"retry_after": 5}
+
+
+def test_search_result_cache_expiry_and_eviction():
+    """Test the in-memory result cache honours its TTL and size limit"""
+    from app.utils.result_cache import SearchResultCache
+
+    cache = SearchResultCache()
+    cache.max_entries = 2
+    cache.set("a", [])
+    cache.set("b", [])
+    assert cache.get("a") == []
+    cache.set("c", [])  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.get("a") == []
+
+    cache.ttl_seconds = 0
+    assert cache.get("c") is None
+
+
+def test_exception_attributes_use_slots():
+    """Test slotted exception attributes survive a pickle round trip"""
+    import pickle
+
+    from app.exceptions import ImageProxyError, ScraperError
+
+    error = ScraperError("Timed out", merchant="ebay")
+    assert error.error_code == "SCRAPER_ERROR"
+    assert error.__dict__ == {}
+
+    for original in (error, ImageProxyError("Image is too large", status_code=413)):
+        restored = pickle.loads(pickle.dumps(original))
+        assert type(restored) is type(original)
+        assert restored.status_code == original.status_code
+        assert restored.to_dict() == original.to_dict()
+        assert restored.args == original.args
+
+
+def test_browser_cdp_url_from_env(monkeypatch):
+    """Test the shared Chromium endpoint can be set from the environment"""
+    from app.config import config
+
+    monkeypatch.delenv("BROWSER_CDP_URL", raising=False)
+    assert config.get_browser_cdp_url() == ""
+    monkeypatch.setenv("BROWSER_CDP_URL", "http://chromium:9222")
+    assert config.get_browser_cdp_url() == "http://chromium:9222"
+
+
+async def test_geolocation_uses_shared_client(mock_http):
+    """Test IP lookups go through the shared HTTP client"""
+    import httpx
+
+    from app.utils.geolocation import GeolocationService
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/json/203.0.113.7"
+        return httpx.Response(200, json={"status": "success", "country": "US", "regionCode": "WA"})
+
+    mock_http(handler)
+
+    service = GeolocationService()
+    location = await service.get_location_from_ip("203.0.113.7")
+    assert location["state"] == "WA"
+    assert service._cache.get("203.0.113.7") == location
+
+
+async def test_validate_query_combines_lookups(mock_http):
+    """Test validation uses both the autocomplete and instant answer lookups"""
+    import httpx
+
+    from app.utils.search_validator import SearchValidator
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/ac":
+            return httpx.Response(200, json=[{"phrase": "laptop stand"}])
+        return httpx.Response(200, json={"AbstractText": "A portable computer"})
+
+    mock_http(handler)
+
+    result = await SearchValidator().validate_query("laptop")
+    assert result["has_results"]
+    assert result["suggestions"] == ["laptop stand"]
+    assert result["confidence"] == 0.9
+
+
+async def test_validation_cache_ignores_case(mock_http):
+    """Test case variants of a query reuse one cached validation"""
+    import httpx
+
+    from app.utils.search_validator import SearchValidator
+
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        return httpx.Response(200, json=[] if request.url.path == "/ac" else {})
+
+    mock_http(handler)
+
+    validator = SearchValidator()
+    first = await validator.validate_query("Laptop")
+    assert await validator.validate_query("  laptop ") == first
+    assert len(requested) == 2
+
+
+async def test_robots_txt_fetched_once(mock_http):
+    """Test robots.txt is parsed from the single async fetch"""
+    import httpx
+
+    from app.utils.database import db
+    from app.utils.rate_limiter import RateLimiter
+
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        return httpx.Response(200, text="User-agent: *\nDisallow: /private\n")
+
+    conn = await db._get_connection()
+    await conn.execute("DELETE FROM robots_cache WHERE domain = 'https://fetch.example'")
+
+    mock_http(handler)
+
+    limiter = RateLimiter()
+    assert await limiter.check_robots_txt("https://fetch.example/search?q=tv")
+    assert not await limiter.check_robots_txt("https://fetch.example/private/item")
+    assert requested == ["https://fetch.example/robots.txt"]
+
+
+async def test_robots_txt_refetched_after_ttl(monkeypatch, mock_http):
+    """Test robots.txt rules are fetched again once they are older than the TTL"""
+    import time
+
+    import httpx
+
+    from app.utils.database import db
+    from app.utils.rate_limiter import ROBOTS_TXT_TTL_HOURS, RateLimiter
+
+    rules = ["User-agent: *\nDisallow: /private\n"]
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text=rules[0])
+
+    conn = await db._get_connection()
+    await conn.execute("DELETE FROM robots_cache WHERE domain = 'https://stale.example'")
+
+    mock_http(handler)
+
+    limiter = RateLimiter()
+    assert not await limiter.check_robots_txt("https://stale.example/private/item")
+
+    # The site lifts the rule; the database copy expires along with the parser
+    rules[0] = "User-agent: *\nDisallow:\n"
+    await conn.execute("DELETE FROM robots_cache WHERE domain = 'https://stale.example'")
+    assert not await limiter.check_robots_txt("https://stale.example/private/item")
+
+    later = time.time() + ROBOTS_TXT_TTL_HOURS * 3600 + 1
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert await limiter.check_robots_txt("https://stale.example/private/item")
+
+
+async def test_robots_txt_cached_in_database(monkeypatch):
+    """Test a stored robots.txt is used without fetching it again"""
+    from app.utils.database import db
+    from app.utils.http_client import http_client_pool
+    from app.utils.rate_limiter import RateLimiter
+
+    def fail():
+        raise AssertionError("robots.txt should come from the cache")
+
+    await db.cache_robots_txt("https://robots.example", "User-agent: *\nDisallow: /private\n")
+    monkeypatch.setattr(http_client_pool, "get_client", fail)
+
+    limiter = RateLimiter()
+    assert await limiter.check_robots_txt("https://robots.example/search?q=tv")
+    assert not await limiter.check_robots_txt("https://robots.example/private/item")
+
+
+def test_estimate_shipping(monkeypatch):
+    """Test per-merchant free shipping thresholds"""
+    from app.config import config
+    from app.utils.geolocation import geolocation_service
+
+    monkeypatch.setattr(config, "is_shipping_enabled", lambda: True)
+
+    assert geolocation_service.estimate_shipping("Amazon", 30.0) == 0.0
+    assert geolocation_service.estimate_shipping("amazon", 20.0) == 5.99
+    assert geolocation_service.estimate_shipping("newegg", 40.0) == 7.99
+    assert geolocation_service.estimate_shipping("ebay", 500.0) == 5.99
+    assert geolocation_service.estimate_shipping("unknown", 500.0) == 5.99
+
+
+def test_rate_limiter_adapts_delay():
+    """Test throttled responses double a domain's delay and successes shrink it"""
+    from app.utils.rate_limiter import MIN_DELAY, RateLimiter
+
+    limiter = RateLimiter(default_delay=1.0)
+    limiter.report_response("https://shop.example", 429)
+    assert limiter.domain_delay["https://shop.example"] == 2.0
+
+    for _ in range(100):
+        limiter.report_response("https://shop.example", 200)
+    assert limiter.domain_delay["https://shop.example"] == MIN_DELAY
+
+
+async def test_robots_verdict_memoized(monkeypatch):
+    """Test a URL's robots.txt verdict is reused without re-checking the rules"""
+    from app.utils.database import db
+    from app.utils.rate_limiter import RateLimiter
+
+    await db.cache_robots_txt("https://memo.example", "User-agent: *\nDisallow: /private\n")
+    limiter = RateLimiter()
+    assert not await limiter.check_robots_txt("https://memo.example/private/item")
+
+    # A second check must not walk the rules again
+    monkeypatch.setattr(limiter.robots_parsers.get("https://memo.example"), "can_fetch", None)
+    assert not await limiter.check_robots_txt("https://memo.example/private/item")
+
+
+async def test_rate_limiter_caps_requests_per_window(monkeypatch):
+    """Test requests past max_per_minute wait for the window to slide"""
+    from app.utils import rate_limiter as rate_limiter_module
+
+    clock = [1000.0]
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(rate_limiter_module.time, "time", lambda: clock[0])
+    monkeypatch.setattr(rate_limiter_module.asyncio, "sleep", fake_sleep)
+
+    limiter = rate_limiter_module.RateLimiter(default_delay=0.0, max_per_minute=2)
+    await limiter.wait_if_needed("https://shop.example")
+    await limiter.wait_if_needed("https://shop.example")
+    assert sleeps == []
+
+    await limiter.wait_if_needed("https://shop.example")
+    assert sleeps == [60.0]
+
+
+async def test_suggestions_deduplicated(mock_http):
+    """Test autocomplete suggestions drop the query itself and duplicates, keeping order"""
+    import httpx
+
+    from app.utils.search_validator import SearchValidator
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            json=[
+                {"phrase": "Laptop"},
+                {"phrase": "laptop bag "},
+                "laptop stand",
+                {"phrase": "laptop bag"},
+                {"other": "ignored"},
+            ],
+        )
+
+    mock_http(handler)
+
+    suggestions = await SearchValidator()._get_suggestions("laptop")
+    assert suggestions == ["laptop bag", "laptop stand"]
+
+
+async def test_robots_txt_failures_allow_and_retry(mock_http):
+    """Test a missing robots.txt allows access and a failed fetch isn't remembered"""
+    import httpx
+
+    from app.utils.database import db
+    from app.utils.rate_limiter import RateLimiter
+
+    statuses = iter([503, 404])
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        return httpx.Response(next(statuses))
+
+    conn = await db._get_connection()
+    await conn.execute("DELETE FROM robots_cache WHERE domain = 'https://flaky.example'")
+    mock_http(handler)
+
+    limiter = RateLimiter()
+    # 503 allows this request but is retried; 404 allows and is kept
+    assert await limiter.check_robots_txt("https://flaky.example/search?q=tv")
+    assert await limiter.check_robots_txt("https://flaky.example/search?q=tv")
+    assert await limiter.check_robots_txt("https://flaky.example/search?q=tv")
+    assert len(requested) == 2
+
+
+async def test_rate_limiter_spaces_concurrent_callers(monkeypatch):
+    """Test concurrent callers for one domain get slots one delay apart"""
+    import asyncio
+
+    from app.utils import rate_limiter as rate_limiter_module
+
+    real_sleep = asyncio.sleep
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        await real_sleep(0)
+
+    monkeypatch.setattr(rate_limiter_module.time, "time", lambda: 1000.0)
+    monkeypatch.setattr(rate_limiter_module.asyncio, "sleep", fake_sleep)
+
+    limiter = rate_limiter_module.RateLimiter(default_delay=1.0)
+    await asyncio.gather(*(limiter.wait_if_needed("https://shop.example") for _ in range(3)))
+    assert sorted(sleeps) == [1.0, 2.0]
+
+
+async def test_robots_verdict_keyed_on_path_unless_rules_use_queries():
+    """Test verdicts are shared across queries unless robots rules match query strings"""
+    from app.utils.database import db
+    from app.utils.rate_limiter import RateLimiter
+
+    await db.cache_robots_txt("https://paths.example", "User-agent: *\nDisallow: /private\n")
+    await db.cache_robots_txt("https://queries.example", "User-agent: *\nDisallow: /s?k=blocked\n")
+    limiter = RateLimiter()
+
+    assert await limiter.check_robots_txt("https://paths.example/s?k=tv")
+    assert await limiter.check_robots_txt("https://paths.example/s?k=laptop")
+    assert len(limiter._robots_verdicts._cache) == 1
+
+    assert await limiter.check_robots_txt("https://queries.example/s?k=tv")
+    assert not await limiter.check_robots_txt("https://queries.example/s?k=blocked")